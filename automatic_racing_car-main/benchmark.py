@@ -0,0 +1,341 @@
+# benchmark.py
+"""Benchmark suite simulator: micro (per fungsi), macro (langkah simulasi
+penuh), dan sweep skala (jumlah cone, jumlah mobil, panjang sensor).
+
+Hasil disimpan sebagai JSON (`results`: nama -> mikrodetik per panggilan,
+`curves`: kurva skala), dan mode compare menandai regresi antar dua file.
+
+Contoh:
+    python benchmark.py run --out bench_base.json
+    python benchmark.py run --out bench_new.json --quick
+    python benchmark.py compare bench_base.json bench_new.json --threshold 0.10
+    python benchmark.py sensors          # scalar vs batch NumPy read_sensors
+"""
+
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+
+import numpy as np
+
+from track import Track
+from car import Car
+from cones import ConeManager
+from race import Race, make_controller, default_start_poses, SENSOR_LEN, MAX_SPEED, CONE_RADIUS, CONE_KEEPOUT, CONE_COUNT, CONE_SPACING
+from race import default_start_line, CONTROLLER_KINDS
+from progress import progress_for
+from fleet import Fleet, grid_start_poses
+
+TRACK_IMAGE = "assets/track_nascar.png"
+
+SWEEP_CONES = [0, 10, 50, 200]
+SWEEP_CARS = [1, 10, 50, 100]
+SWEEP_SENSOR_LEN = [160, 320, 640]
+
+
+def random_road_poses(track, n, seed=0):
+    """Ambil n pose acak (x, y, heading) di atas jalan"""
+    rng = np.random.default_rng(seed)
+    ys, xs = np.nonzero(track.road_mask)
+    idx = rng.integers(0, len(xs), n)
+    headings = rng.uniform(-math.pi, math.pi, n)
+    return [(float(xs[i]), float(ys[i]), float(h)) for i, h in zip(idx, headings)]
+
+
+def offroad_poses(track, n, seed=0, max_dist=15):
+    """Ambil n pose acak tepat di luar jalan (<= max_dist px), untuk benchmark tabrakan dinding"""
+    rng = np.random.default_rng(seed)
+    ys, xs = np.nonzero(~track.road_mask)
+    ry, rx = track.nearest_road[0, ys, xs], track.nearest_road[1, ys, xs]
+    near = np.hypot(ry - ys, rx - xs) <= max_dist
+    ys, xs = ys[near], xs[near]
+    idx = rng.integers(0, len(xs), n)
+    headings = rng.uniform(-math.pi, math.pi, n)
+    return [(float(xs[i]), float(ys[i]), float(h)) for i, h in zip(idx, headings)]
+
+
+def time_per_call(fn, items, repeat=3):
+    """Waktu terbaik (detik) per panggilan fn(item) dari beberapa ulangan"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, (time.perf_counter() - t0) / len(items))
+    return best
+
+
+def _make_cones(track, n, seed=0):
+    return ConeManager(track, n=n, radius=CONE_RADIUS, keepout=CONE_KEEPOUT, image_path=None, seed=seed,
+                       min_spacing=CONE_SPACING)
+
+
+def _make_cars(track, sensor_len=SENSOR_LEN):
+    car = Car((0, 0), (220, 40, 40), track, sensor_len=sensor_len)
+    other = Car((0, 0), (40, 130, 235), track, sensor_len=sensor_len)
+    car.max_speed = MAX_SPEED
+    return car, other
+
+
+def _placer(car, other):
+    """Fungsi yang memindahkan car (dan other 40 px di kanannya) ke pose"""
+    def place(pose):
+        x, y, h = pose
+        car.pos.update(x, y)
+        car.heading = h
+        other.pos.update(x + 40, y)
+    return place
+
+
+# metode march tiap jalur read_sensors. Jalur batch tidak memakai sphere
+# tracing: versi NumPy-nya butuh satu iterasi per sample ray terpanjang
+# (~18 rata-rata), tiap iterasi belasan operasi kecil, sehingga ~5x lebih
+# lambat dari satu pass dense (lihat Car._cast_rays_hit)
+SENSOR_PATHS = {
+    "scalar": "sphere tracing distance field, per ray",
+    "batched": "semua sample grid 3 px sekaligus (NumPy dense)",
+}
+
+
+def bench_sensors(track, n=2000, cone_count=10, sensor_len=SENSOR_LEN, seed=0):
+    """Waktu rata-rata read_sensors per panggilan (detik): jalur scalar vs batched"""
+    cones = _make_cones(track, cone_count, seed)
+    poses = random_road_poses(track, n, seed)
+    car, other = _make_cars(track, sensor_len)
+    place = _placer(car, other)
+
+    results = {}
+    for label, batched in (("scalar", False), ("batched", True)):
+        car.batched_sensors = batched
+
+        def read(pose):
+            place(pose)
+            car.read_sensors(cones=cones, other_car=other)
+        results[label] = time_per_call(read, poses, repeat=1)
+    return results
+
+
+def bench_read_sensors(track, n, cone_count=CONE_COUNT, sensor_len=SENSOR_LEN, seed=0):
+    """Detik per read_sensors (jalur default) di n pose acak"""
+    cones = _make_cones(track, cone_count, seed)
+    poses = random_road_poses(track, n, seed)
+    car, other = _make_cars(track, sensor_len)
+    place = _placer(car, other)
+
+    def read(pose):
+        place(pose)
+        car.read_sensors(cones=cones, other_car=other)
+    return time_per_call(read, poses)
+
+
+def bench_race_step(track, cone_count=CONE_COUNT, steps=600, seed=0, controllers=("rule", "fuzzy")):
+    """Detik per Race.step (sensor + kontrol + fisika + tabrakan + lap, 2 mobil)"""
+    race = Race(track, _make_cones(track, cone_count, seed), controllers=controllers)
+    dt = 1.0 / 60.0
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        race.step(dt)
+    return (time.perf_counter() - t0) / steps
+
+
+def bench_fleet_step(track, n_cars, cone_count=CONE_COUNT, steps=120, seed=0):
+    """Detik per Fleet.step untuk n_cars mobil"""
+    x0, y0, heading = default_start_poses(track)[0]
+    poses = grid_start_poses(track, n_cars, (x0, y0), heading)
+    fleet = Fleet(track, _make_cones(track, cone_count, seed), poses)
+    dt = 1.0 / 60.0
+    fleet.step(dt)  # langkah pertama membangun raster obstacle
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        fleet.step(dt)
+    return (time.perf_counter() - t0) / steps
+
+
+def run_micro(track, n, seed=0):
+    """Micro benchmark per fungsi, hasil: nama -> detik per panggilan"""
+    cones = _make_cones(track, CONE_COUNT, seed)
+    poses = random_road_poses(track, n, seed)
+    car, other = _make_cars(track)
+    place = _placer(car, other)
+
+    rng = np.random.default_rng(seed)
+    points = list(zip(rng.uniform(0, track.width, n * 10).tolist(), rng.uniform(0, track.height, n * 10).tolist()))
+    controls = list(zip(rng.uniform(-1, 1, n).tolist(), rng.uniform(0, 1, n).tolist(), rng.uniform(0, 0.2, n).tolist()))
+
+    # sensor dict asli dari pose acak sebagai input controller
+    sensors = []
+    for pose in poses:
+        place(pose)
+        s = car.read_sensors(cones=cones, other_car=other)
+        s["speed"] = float(rng.uniform(0, MAX_SPEED))
+        sensors.append(s)
+
+    def cast_ray(pose):
+        place(pose)
+        car._cast_ray(pose[2], car.sensor_len, cones.cones, other)
+
+    def read_sensors(pose):
+        place(pose)
+        car.read_sensors(cones=cones, other_car=other)
+
+    def collide(pose):
+        place(pose)
+        cones.collide_car(car)
+
+    def update(ctrl):
+        car.update(1.0 / 60.0, *ctrl)
+
+    def collide_wall(pose):
+        place(pose)
+        car.collide_wall()
+
+    out = {
+        "track.is_road": time_per_call(lambda p: track.is_road(*p), points),
+        "car.cast_ray": time_per_call(cast_ray, poses),
+        "car.read_sensors": time_per_call(read_sensors, poses),
+        "cones.collide_car": time_per_call(collide, poses),
+        "car.update": time_per_call(update, controls),
+        "car.collide_wall": time_per_call(collide_wall, offroad_poses(track, n, seed)),
+    }
+    track_progress = progress_for(track, default_start_line(track), default_start_poses(track)[0][:2])
+    for kind in CONTROLLER_KINDS:
+        ctrl = make_controller(kind, track, track_progress)
+        out[f"controller.{kind}.act"] = time_per_call(ctrl.act, sensors)
+    return out
+
+
+def run_suite(track, quick=False, seed=0):
+    """Jalankan semua benchmark; hasil dict siap disimpan ke JSON"""
+    n = 300 if quick else 2000
+    steps = 120 if quick else 600
+    results = {f"micro.{k}": v for k, v in run_micro(track, n, seed).items()}
+    results["macro.race_step"] = bench_race_step(track, steps=steps, seed=seed)
+    results["macro.fleet_step.100"] = bench_fleet_step(track, 100, steps=steps // 5, seed=seed)
+
+    curves = {"cones": {"x": SWEEP_CONES, "read_sensors": [], "race_step": []},
+              "cars": {"x": SWEEP_CARS, "fleet_step": []},
+              "sensor_len": {"x": SWEEP_SENSOR_LEN, "read_sensors": []}}
+    for c in SWEEP_CONES:
+        curves["cones"]["read_sensors"].append(bench_read_sensors(track, n // 2, cone_count=c, seed=seed))
+        curves["cones"]["race_step"].append(bench_race_step(track, cone_count=c, steps=steps // 2, seed=seed))
+    for m in SWEEP_CARS:
+        curves["cars"]["fleet_step"].append(bench_fleet_step(track, m, steps=steps // 5, seed=seed))
+    for length in SWEEP_SENSOR_LEN:
+        curves["sensor_len"]["read_sensors"].append(bench_read_sensors(track, n // 2, sensor_len=length, seed=seed))
+
+    # titik kurva juga masuk results agar ikut dibandingkan di mode compare
+    for axis, curve in curves.items():
+        for metric, values in curve.items():
+            if metric == "x":
+                continue
+            for x, v in zip(curve["x"], values):
+                results[f"sweep.{axis}={x}.{metric}"] = v
+
+    to_us = lambda v: round(v * 1e6, 3)
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "track": track.img_path,
+            "quick": quick,
+            "seed": seed,
+        },
+        "unit": "us",
+        "results": {k: to_us(v) for k, v in results.items()},
+        "curves": {axis: {m: (vals if m == "x" else [to_us(v) for v in vals]) for m, vals in curve.items()}
+                   for axis, curve in curves.items()},
+    }
+
+
+def compare(base, new, threshold=0.10):
+    """
+    Bandingkan dua hasil run_suite. Returns list (nama, base_us, new_us,
+    rasio) untuk semua metric yang ada di keduanya, dan list nama regresi
+    (new lebih lambat dari base lebih dari threshold).
+    """
+    rows, regressions = [], []
+    for name in sorted(set(base["results"]) & set(new["results"])):
+        b, n = base["results"][name], new["results"][name]
+        ratio = n / b if b > 0 else float("inf")
+        rows.append((name, b, n, ratio))
+        if ratio > 1.0 + threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def print_results(res):
+    for name, us in res["results"].items():
+        if name.startswith("sweep."):
+            continue
+        extra = f"  ({1e6 / us:8.0f} langkah/detik)" if name.startswith("macro.") else ""
+        print(f"  {name:32s} {us:10.2f} us{extra}")
+    for axis, curve in res["curves"].items():
+        print(f"\n  sweep {axis}:")
+        for i, x in enumerate(curve["x"]):
+            cols = "  ".join(f"{m}={vals[i]:9.1f} us" for m, vals in curve.items() if m != "x")
+            print(f"    {axis}={x:<5} {cols}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite simulator")
+    sub = parser.add_subparsers(dest="cmd")
+
+    p_run = sub.add_parser("run", help="jalankan suite dan simpan JSON")
+    p_run.add_argument("--track", default=TRACK_IMAGE)
+    p_run.add_argument("--out", default=None, help="file JSON hasil")
+    p_run.add_argument("--quick", action="store_true", help="sampel lebih sedikit")
+    p_run.add_argument("--seed", type=int, default=0)
+
+    p_cmp = sub.add_parser("compare", help="bandingkan dua file hasil")
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=0.10, help="batas regresi relatif (0.10 = 10%%)")
+
+    p_sens = sub.add_parser("sensors", help="read_sensors scalar vs batched")
+    p_sens.add_argument("--track", default=TRACK_IMAGE)
+    p_sens.add_argument("-n", type=int, default=2000, help="jumlah pose acak")
+    p_sens.add_argument("--cones", type=int, default=CONE_COUNT)
+    p_sens.add_argument("--sensor-len", type=int, default=SENSOR_LEN)
+
+    args = parser.parse_args()
+
+    if args.cmd == "compare":
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        rows, regressions = compare(base, new, args.threshold)
+        for name, b, n, ratio in rows:
+            flag = "  REGRESI" if name in regressions else ""
+            print(f"  {name:40s} {b:10.2f} -> {n:10.2f} us  x{ratio:5.2f}{flag}")
+        print(f"\n{len(regressions)} regresi (> {args.threshold:.0%} lebih lambat) dari {len(rows)} metric")
+        sys.exit(1 if regressions else 0)
+
+    if args.cmd == "sensors":
+        track = Track(args.track)
+        res = bench_sensors(track, args.n, args.cones, args.sensor_len)
+        for label, t in res.items():
+            print(f"{label:8s}: {t * 1e6:8.1f} us/read_sensors  ({SENSOR_PATHS[label]})")
+        print(f"speedup : {res['scalar'] / res['batched']:.2f}x")
+        return
+
+    if args.cmd is None:
+        args = p_run.parse_args([])
+    track = Track(args.track)
+    t0 = time.perf_counter()
+    res = run_suite(track, quick=args.quick, seed=args.seed)
+    print_results(res)
+    print(f"\nsuite selesai dalam {time.perf_counter() - t0:.1f}s")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(res, f, indent=2)
+        print(f"hasil disimpan ke {args.out}")
+
+
+if __name__ == "__main__":
+    main()
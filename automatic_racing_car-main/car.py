@@ -3,39 +3,106 @@
 
 import pygame
 import math
+import numpy as np
 from utils import clamp
 
+# warna ray debug per jenis hit (wall / tidak kena memakai sensor_color mobil)
+HIT_COLORS = {"cone": (255, 150, 0), "car": (255, 0, 255)}
+
+
+# drag (dan perlambatan setelah finish) didefinisikan per 1/DRAG_HZ detik,
+# lalu dipangkatkan dt * DRAG_HZ agar tidak bergantung frame rate
+DRAG_HZ = 60
+# jarak (px) ke dalam jalan saat recovery tabrakan dinding
+WALL_MARGIN = 3.0
+# batas fisika mobil (dipakai juga Fleet dan racing_line)
+ACCEL = 2100  # px/s^2 saat throttle penuh
+BRAKE_ACCEL = 3400  # px/s^2 saat brake penuh
+DRAG = 0.986  # faktor kecepatan per 1/DRAG_HZ detik
+STEER_RATE = 2.2  # rad/s saat steer penuh
+
+
+class SpriteAtlas:
+    """Sprite mobil yang sudah diputar untuk n bucket heading.
+
+    Dibuat sekali per (warna, jumlah bucket) dan dipakai bersama semua mobil
+    berwarna sama, sehingga draw cukup lookup + blit tanpa alokasi Surface.
+    """
+
+    MAX_BUCKETS = 1440  # batas atas memori per atlas
+    _cache = {}
+
+    def __init__(self, image, buckets=360):
+        self.buckets = int(clamp(buckets, 1, self.MAX_BUCKETS))
+        step = 360.0 / self.buckets
+        self.frames = [pygame.transform.rotate(image, i * step) for i in range(self.buckets)]
+        self.nbytes = sum(f.get_width() * f.get_height() * f.get_bytesize() for f in self.frames)
+
+    @classmethod
+    def get(cls, color, make_sprite, buckets=360):
+        """Ambil atlas untuk warna ini dari cache, buat jika belum ada"""
+        key = (tuple(color), int(buckets))
+        if key not in cls._cache:
+            cls._cache[key] = cls(make_sprite(color), buckets)
+        return cls._cache[key]
+
+    @classmethod
+    def cache_bytes(cls):
+        """Total memori (byte) semua atlas di cache"""
+        return sum(a.nbytes for a in cls._cache.values())
+
+    def frame(self, heading):
+        """Sprite untuk heading (radian), dibulatkan ke bucket terdekat"""
+        deg = -math.degrees(heading) - 90
+        return self.frames[round(deg * self.buckets / 360.0) % self.buckets]
+
 
 class Car:
     """Base class untuk mobil balap dengan sensor dan fisika"""
 
-    def __init__(self, pos, color, track, name="Car", sensor_color=(0, 255, 0), sensor_len=320):
+    def __init__(self, pos, color, track, name="Car", sensor_color=(0, 255, 0), sensor_len=320,
+                 sprite_buckets=360):
         self.track = track
         self.name = name
         self.pos = pygame.Vector2(pos)
         self.heading = -math.pi / 2
         self.vel = 0.0
+        # state fisika langkah sebelumnya, untuk interpolasi render
+        self.prev_pos = pygame.Vector2(pos)
+        self.prev_heading = self.heading
 
         # fisika ringan
         self.max_speed = 900
-        self.accel = 2100
-        self.brake_accel = 3400
-        self.drag = 0.986
+        self.accel = ACCEL
+        self.brake_accel = BRAKE_ACCEL
+        self.drag = DRAG
 
         # sensor (ditambah untuk deteksi lebih baik)
         self.sensor_angles = [-90, -70, -40, -20, 0, 20, 40, 70, 90]
         self.sensor_len = sensor_len
         self.sensor_color = sensor_color
+        # True = semua ray dicast sekaligus dengan NumPy (_cast_rays),
+        # False = satu per satu dengan _cast_ray
+        self.batched_sensors = True
 
-        # sprite
+        # hasil sensor terakhir (lihat read_sensors)
+        self.sensor_snapshot = None
+
+        # sprite + cache sprite yang sudah diputar (dipakai bersama per warna)
         self.image = self._make_sprite(color)
+        self.sprites = SpriteAtlas.get(color, self._make_sprite, sprite_buckets)
 
         # lap counter
         self.lap_count = 0
         self.last_x = pos[0]  # untuk deteksi melewati garis start
+        self.last_y = pos[1]
+        # progress sepanjang centerline (px, kumulatif lintas lap), diisi Race
+        self.progress = 0.0
 
         # radius tabrakan sederhana (berguna untuk cone collision)
         self.hit_radius = 12
+        # recovery tabrakan dinding: luruskan heading sejajar tepi jalan
+        self.align_heading = True
         
         # Cooldowns untuk tabrakan (dalam detik)
         self.cone_hit_cooldown = 0.0
@@ -78,39 +145,195 @@ class Car:
             return True
         return False
 
+    def _obstacle_clearance(self, px, py, cones, other_car):
+        """Jarak (px) dari point (px,py) ke tepi cone / mobil lain terdekat."""
+        clear = 1e9
+        if cones:
+            for c in cones:
+                dx = c.pos.x - px
+                dy = c.pos.y - py
+                clear = min(clear, math.sqrt(dx * dx + dy * dy) - c.radius)
+        if other_car:
+            dx = other_car.pos.x - px
+            dy = other_car.pos.y - py
+            total_radius = self.hit_radius + other_car.hit_radius
+            clear = min(clear, math.sqrt(dx * dx + dy * dy) - total_radius)
+        return clear
+
     def _cast_ray(self, ang, maxlen, cones=None, other_car=None):
         """Cast ray sensor untuk mendeteksi jarak ke tepi jalan, cone, atau mobil lain"""
+        return self._cast_ray_hit(ang, maxlen, cones=cones, other_car=other_car)[0]
+
+    def _cast_ray_hit(self, ang, maxlen, cones=None, other_car=None):
+        """Seperti _cast_ray, tapi mengembalikan (jarak, jenis hit).
+
+        Jenis hit: "wall", "cone", "car", atau None jika ray tidak menabrak apa pun.
+
+        Sphere tracing: sample tetap di grid 3 px (hasil identik dengan
+        stepping biasa), tapi sample yang dijamin bebas menurut distance field
+        track dan jarak ke obstacle dilompati sekaligus.
+        """
         x, y = self.pos
         step = 3
+        cos_a = math.cos(ang)
+        sin_a = math.sin(ang)
+        # pembulatan int() menggeser point maks. sqrt(2) px, dua kali (point
+        # sekarang dan point tujuan) -> margin 3 px agar lompatan selalu aman
+        margin = 3
 
-        for d in range(0, int(maxlen), step):
-            px = int(x + math.cos(ang) * d)
-            py = int(y + math.sin(ang) * d)
+        d = 0
+        end = int(maxlen)
+        while d < end:
+            px = int(x + cos_a * d)
+            py = int(y + sin_a * d)
 
             # 1) tepi jalan
-            if not self.track.is_road(px, py):
-                return d
+            clear = self.track.road_distance(px, py)
+            if clear <= 0:
+                return d, "wall"
 
             # 2) cone sebagai obstacle
             if self._point_hits_cone(px, py, cones):
-                return d
-            
+                return d, "cone"
+
             # 3) mobil lain sebagai obstacle
             if self._point_hits_car(px, py, other_car):
-                return d
+                return d, "car"
+
+            # lompati semua sample grid yang pasti masih bebas
+            if cones or other_car:
+                clear = min(clear, self._obstacle_clearance(px, py, cones, other_car))
+            skip = clear - margin
+            d += step * (max(int(skip // step), 0) + 1)
+
+        return maxlen, None
 
-        return maxlen
+    def _cast_rays(self, angs, maxlens, cones=None, other_car=None):
+        """Versi batch dari _cast_ray: semua ray di-march sekaligus sebagai
+        array (ray x sample), hasil identik dengan _cast_ray per ray."""
+        return self._cast_rays_hit(angs, maxlens, cones=cones, other_car=other_car)[0]
+
+    def _cast_rays_hit(self, angs, maxlens, cones=None, other_car=None):
+        """Versi batch dari _cast_ray_hit, mengembalikan (list jarak, list jenis hit).
+
+        Semua sample grid 3 px dicek sekaligus, tanpa sphere tracing: di NumPy
+        biaya per operasi jauh lebih besar dari biaya per elemen, dan sphere
+        tracing batch butuh satu iterasi per sample ray terpanjang (rata-rata
+        18, p95 30 di pose acak), masing-masing ~25 operasi kecil. Satu pass
+        dense (~1000 sample) lebih cepat; lihat `benchmark.py sensors`.
+        """
+        x, y = self.pos
+        step = 3
+        ends = np.array([int(m) for m in maxlens])
+        d = np.arange(0, ends.max(), step)
+
+        # math.cos/sin per sudut (bukan np.cos) agar koordinat sample bit-identik
+        cos_a = np.array([math.cos(a) for a in angs])[:, None]
+        sin_a = np.array([math.sin(a) for a in angs])[:, None]
+        px = (x + cos_a * d).astype(np.intp)
+        py = (y + sin_a * d).astype(np.intp)
+
+        # 1) tepi jalan
+        wall = ~self.track.is_road_many(px, py)
+        blocked = wall.copy()
+
+        # 2) cone sebagai obstacle
+        cone = None
+        if cones:
+            cx = np.array([c.pos.x for c in cones])
+            cy = np.array([c.pos.y for c in cones])
+            cr = np.array([c.radius for c in cones])
+            dx = cx - px[..., None]
+            dy = cy - py[..., None]
+            cone = (dx * dx + dy * dy <= cr * cr).any(axis=-1)
+            blocked |= cone
+
+        # 3) mobil lain sebagai obstacle
+        if other_car:
+            total_radius = self.hit_radius + other_car.hit_radius
+            dx = other_car.pos.x - px
+            dy = other_car.pos.y - py
+            blocked |= dx * dx + dy * dy <= total_radius * total_radius
+
+        # sample di luar panjang ray masing-masing diabaikan
+        blocked &= d[None, :] < ends[:, None]
+        first = blocked.argmax(axis=1)
+        rows = np.arange(len(angs))
+        hit = blocked[rows, first]
+
+        # jenis hit mengikuti urutan cek _cast_ray: wall, lalu cone, lalu car
+        kinds = []
+        for r, i, h in zip(rows, first, hit):
+            if not h:
+                kinds.append(None)
+            elif wall[r, i]:
+                kinds.append("wall")
+            elif cone is not None and cone[r, i]:
+                kinds.append("cone")
+            else:
+                kinds.append("car")
+        dists = [int(d[i]) if h else m for i, h, m in zip(first, hit, maxlens)]
+        return dists, kinds
+
+    def _batch_cones(self, angs, maxlens, cones, r=2):
+        """Gabungan kandidat cone semua ray (seperti _ray_cones), dihitung
+        sekaligus: jarak tiap cone ke tiap segmen ray dengan NumPy."""
+        cone_list = getattr(cones, "cones", cones)
+        if not cone_list:
+            return []
+        x, y = self.pos
+        cx = np.array([c.pos.x for c in cone_list])
+        cy = np.array([c.pos.y for c in cone_list])
+        lim = np.array([c.radius for c in cone_list]) + r
+        ux = np.array([math.cos(a) for a in angs])[:, None]
+        uy = np.array([math.sin(a) for a in angs])[:, None]
+        # titik terdekat di segmen ray (panjang maxlen) ke pusat cone
+        t = np.clip((cx - x) * ux + (cy - y) * uy, 0.0, np.array(maxlens, dtype=np.float64)[:, None])
+        ex = x + ux * t - cx
+        ey = y + uy * t - cy
+        near = (ex * ex + ey * ey <= lim * lim).any(axis=0)
+        return [c for c, k in zip(cone_list, near) if k]
+
+    def _ray_cones(self, angs, maxlens, cones):
+        """Kandidat cone per ray. Jika cones adalah ConeManager, hanya cone di
+        dekat segmen ray yang diambil dari grid-nya."""
+        if not hasattr(cones, "cones_on_segment"):
+            return [cones] * len(angs)
+        x, y = self.pos
+        # int() menggeser sample maks. sqrt(2) px dari garis ray -> margin 2 px
+        return [
+            cones.cones_on_segment(x, y, x + math.cos(a) * m, y + math.sin(a) * m, r=2)
+            for a, m in zip(angs, maxlens)
+        ]
 
     def read_sensors(self, cones=None, other_car=None):
-        """Membaca semua sensor dan mengembalikan dict sensor values"""
-        dists = []
-        for deg in self.sensor_angles:
-            ang = self.heading + math.radians(deg)
-            d = self._cast_ray(ang, self.sensor_len, cones=cones, other_car=other_car)
-            dists.append(d)
+        """Membaca semua sensor dan mengembalikan dict sensor values.
+
+        cones boleh berupa list Cone atau ConeManager (pakai spatial grid).
+        """
+        angs = [self.heading + math.radians(deg) for deg in self.sensor_angles]
+        # Sensor jarak jauh tambahan (ray terakhir)
+        angs.append(self.heading)
+        maxlens = [self.sensor_len] * len(self.sensor_angles) + [self.sensor_len * 1.5]
+
+        if self.batched_sensors:
+            near = self._batch_cones(angs, maxlens, cones)
+            dists, hits = self._cast_rays_hit(angs, maxlens, cones=near, other_car=other_car)
+        else:
+            dists, hits = [], []
+            for ang, m, rc in zip(angs, maxlens, self._ray_cones(angs, maxlens, cones)):
+                d, kind = self._cast_ray_hit(ang, m, cones=rc, other_car=other_car)
+                dists.append(d)
+                hits.append(kind)
 
-        # Sensor jarak jauh tambahan
-        long_front_dist = self._cast_ray(self.heading, self.sensor_len * 1.5, cones=cones, other_car=other_car)
+        # Snapshot sensor frame ini, dipakai ulang oleh debug draw / overlay
+        self.sensor_snapshot = {
+            "heading": self.heading,
+            "angles": angs,
+            "dists": list(dists),
+            "hits": hits,
+        }
+        long_front_dist = dists.pop()
 
         # Dengan 9 sensor: [-90, -70, -40, -20, 0, 20, 40, 70, 90]
         far_left = dists[0]
@@ -133,6 +356,10 @@ class Car:
             "far_right": far_right,
             "bias": bias,
             "speed": self.vel,
+            # pose (dipakai controller yang mengikuti racing line)
+            "x": self.pos.x,
+            "y": self.pos.y,
+            "heading": self.heading,
         }
 
     def update(self, dt, steer, throttle, brake):
@@ -143,18 +370,21 @@ class Car:
         if self.car_hit_cooldown > 0:
             self.car_hit_cooldown -= dt
 
+        self.prev_pos.update(self.pos)
+        self.prev_heading = self.heading
+
         # Jangan update jika sudah finish
         if self.finished:
-            self.vel *= 0.9 # Perlambat mobil sampai berhenti
+            self.vel *= 0.9 ** (dt * DRAG_HZ) # Perlambat mobil sampai berhenti
             return
 
         # rotasi
-        self.heading += steer * 2.2 * dt
+        self.heading += steer * STEER_RATE * dt
 
         # update kecepatan
         self.vel += throttle * self.accel * dt
         self.vel -= brake * self.brake_accel * dt
-        self.vel *= self.drag
+        self.vel *= self.drag ** (dt * DRAG_HZ)
         self.vel = clamp(self.vel, 0, self.max_speed)
 
         # update posisi
@@ -162,25 +392,27 @@ class Car:
         self.pos.y += math.sin(self.heading) * self.vel * dt
 
     def collide_wall(self):
-        """Cek tabrakan dengan dinding dan recovery"""
-        ix, iy = int(self.pos.x), int(self.pos.y)
-        hit = not self.track.is_road(ix, iy)
+        """
+        Cek tabrakan dengan dinding dan recovery: mobil dipindah ke pixel
+        jalan terdekat (lookup Track.nearest_road, O(1)), WALL_MARGIN px ke
+        dalam jalan. Jika align_heading, heading diluruskan sejajar tepi
+        jalan (arah yang paling dekat dengan heading sekarang).
+        """
+        hit = not self.track.is_road(self.pos.x, self.pos.y)
         if hit:
             self.vel *= 0.5
-            # dorong masuk ke area 'jalan' terdekat (pencarian kipas kecil)
-            best = None
-            bestd = 1e9
-            for a in range(-90, 91, 15):
-                ang = math.radians(a)
-                for d in range(18, 80, 6):
-                    px = int(self.pos.x + math.cos(self.heading + ang) * d)
-                    py = int(self.pos.y + math.sin(self.heading + ang) * d)
-                    if self.track.is_road(px, py):
-                        if d < bestd:
-                            bestd, best = d, (px, py, self.heading + ang)
-                        break
-            if best:
-                self.pos.x, self.pos.y, self.heading = best
+            rx, ry, nx, ny = self.track.nearest_road_point(self.pos.x, self.pos.y)
+            px, py = rx + 0.5 + nx * WALL_MARGIN, ry + 0.5 + ny * WALL_MARGIN
+            if not self.track.is_road(px, py):
+                px, py = rx + 0.5, ry + 0.5
+            self.pos.update(px, py)
+            if self.align_heading and (nx or ny):
+                # tangen tepi jalan, searah heading sekarang
+                tx, ty = -ny, nx
+                if math.cos(self.heading) * tx + math.sin(self.heading) * ty < 0:
+                    tx, ty = -tx, -ty
+                delta = math.atan2(ty, tx) - self.heading
+                self.heading += (delta + math.pi) % (2 * math.pi) - math.pi
         return hit
 
     def collides_with_car(self, other_car):
@@ -198,15 +430,30 @@ class Car:
             return True
         return False
 
-    def draw(self, screen, debug=False, cones=None):
-        """Render mobil dan sensor (jika debug mode)"""
-        rot = pygame.transform.rotate(self.image, -math.degrees(self.heading) - 90)
-        rect = rot.get_rect(center=(self.pos.x, self.pos.y))
-        screen.blit(rot, rect)
-
-        if debug:
-            for deg in self.sensor_angles:
-                ang = self.heading + math.radians(deg)
-                d = self._cast_ray(ang, self.sensor_len, cones=cones)
-                end = (self.pos.x + math.cos(ang) * d, self.pos.y + math.sin(ang) * d)
-                pygame.draw.line(screen, self.sensor_color, self.pos, end, 2)
+    def draw(self, screen, debug=False, alpha=1.0):
+        """Render mobil dan sensor (jika debug mode), kembalikan list dirty rect.
+
+        alpha < 1 menggambar mobil di antara state fisika sebelumnya (0) dan
+        sekarang (1), untuk render fixed-timestep yang halus.
+        Ray debug diambil dari sensor_snapshot (hasil read_sensors frame ini),
+        tidak di-cast ulang. Warna ray menunjukkan jenis hit.
+        """
+        if alpha < 1.0:
+            pos = self.prev_pos.lerp(self.pos, max(alpha, 0.0))
+            heading = self.prev_heading + (self.heading - self.prev_heading) * alpha
+        else:
+            pos, heading = self.pos, self.heading
+        rot = self.sprites.frame(heading)
+        rect = rot.get_rect(center=(pos.x, pos.y))
+        rects = [screen.blit(rot, rect)]
+
+        snap = self.sensor_snapshot
+        if debug and snap:
+            # hanya 9 sensor utama (tanpa front_long), relatif ke heading sekarang
+            n = len(self.sensor_angles)
+            for a, d, kind in zip(snap["angles"][:n], snap["dists"][:n], snap["hits"][:n]):
+                ang = heading + (a - snap["heading"])
+                end = (pos.x + math.cos(ang) * d, pos.y + math.sin(ang) * d)
+                color = HIT_COLORS.get(kind) or self.sensor_color
+                rects.append(pygame.draw.line(screen, color, pos, end, 2))
+        return rects
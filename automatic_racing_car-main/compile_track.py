@@ -0,0 +1,45 @@
+# compile_track.py
+"""Kompilasi gambar track ke cache (road mask, distance field, nearest-road map).
+
+Run berikutnya (dan worker process pool) memuat cache dengan mmap tanpa decode
+PNG atau klasifikasi ulang. Script ini juga mengukur startup cold vs warm.
+
+Contoh:
+    python compile_track.py assets/track_nascar.png assets/track.png
+"""
+
+import argparse
+import shutil
+import time
+
+from track import Track, CACHE_ROOT
+
+
+def timed_load(img_path, cache_root):
+    t0 = time.perf_counter()
+    track = Track(img_path, cache_root=cache_root)
+    return track, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kompilasi track ke cache")
+    parser.add_argument("images", nargs="+", help="gambar track (png)")
+    parser.add_argument("--cache-root", default=CACHE_ROOT)
+    parser.add_argument("--rebuild", action="store_true", help="hapus cache lama dulu")
+    args = parser.parse_args()
+
+    for img in args.images:
+        fresh, t_nocache = timed_load(img, None)
+        if args.rebuild:
+            shutil.rmtree(fresh._cache_dir(args.cache_root), ignore_errors=True)
+
+        track, t_first = timed_load(img, args.cache_root)
+        _, t_warm = timed_load(img, args.cache_root)
+        print(f"{img} ({track.width}x{track.height}) -> {track.cache_dir}")
+        print(f"  tanpa cache : {t_nocache * 1000:7.1f} ms")
+        print(f"  run pertama : {t_first * 1000:7.1f} ms")
+        print(f"  warm (mmap) : {t_warm * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
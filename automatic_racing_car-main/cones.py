@@ -1,7 +1,36 @@
 # cones.py
+import math
 import random
 import pygame
 
+class ConePlacementError(RuntimeError):
+    """Layout cone valid tidak ditemukan (track terlalu sempit / cone terlalu banyak)"""
+
+
+class _PointGrid:
+    """Grid hash sederhana untuk cek "ada titik dalam jarak r" (cell = r)"""
+
+    def __init__(self, r):
+        self.r = r
+        self.cells = {}
+
+    def add(self, x, y):
+        if self.r > 0:
+            self.cells.setdefault((int(x // self.r), int(y // self.r)), []).append((x, y))
+
+    def near(self, x, y):
+        if self.r <= 0:
+            return False
+        gx, gy = int(x // self.r), int(y // self.r)
+        lim = self.r * self.r
+        for cx in (gx - 1, gx, gx + 1):
+            for cy in (gy - 1, gy, gy + 1):
+                for px, py in self.cells.get((cx, cy), ()):
+                    if (px - x) ** 2 + (py - y) ** 2 < lim:
+                        return True
+        return False
+
+
 class Cone:
     def __init__(self, pos, radius=10):
         self.pos = pygame.Vector2(pos)
@@ -16,55 +45,162 @@ class ConeManager:
         radius=10,
         keepout=60,
         max_tries=2000,
-        image_path="assets/cone.png"
+        image_path="assets/cone.png",
+        seed=None,
+        cell_size=None,
+        min_spacing=0
     ):
         self.track = track
         self.n = n
         self.radius = radius
         self.keepout = keepout
-        self.max_tries = max_tries
+        self.max_tries = max_tries  # percobaan per cone sebelum ConePlacementError
+        # mode Poisson-disk: jarak minimum antar pusat cone, 0 = mati (cone
+        # boleh tumpang tindih); race memakai race.CONE_SPACING
+        self.min_spacing = min_spacing
+        # RNG sendiri (bukan global random) agar layout cone bisa direproduksi
+        self.rng = random.Random(seed)
 
-        self.width = getattr(track, "width", track.surface.get_width())
-        self.height = getattr(track, "height", track.surface.get_height())
+        self.width = track.width
+        self.height = track.height
 
-        # Load image cone sekali
+        # Load image cone sekali (image_path=None untuk mode headless)
         self.cone_img = None
-        try:
-            img = pygame.image.load(image_path).convert_alpha()
-            size = int(self.radius * 2)
-            self.cone_img = pygame.transform.smoothscale(img, (size, size))
-        except:
-            self.cone_img = None
+        if image_path:
+            try:
+                img = pygame.image.load(image_path).convert_alpha()
+                size = int(self.radius * 2)
+                self.cone_img = pygame.transform.smoothscale(img, (size, size))
+            except:
+                self.cone_img = None
+
+        # Spatial index: grid seragam, cell >= diameter cone terbesar
+        self.cell_size = max(cell_size or 48, 2 * self.radius)
+        self.grid = {}
+        # naik setiap layout berubah (dipakai renderer dan stream untuk cache)
+        self.version = -1
 
         self.cones = [
-            Cone(self._random_road_pos([]), radius=self.radius)
-            for _ in range(self.n)
+            Cone(pos, radius=self.radius)
+            for pos in self._place([])
         ]
+        self.rebuild_grid()
 
-    def _random_road_pos(self, cars):
-        for _ in range(self.max_tries):
-            x = random.randint(0, self.width - 1)
-            y = random.randint(0, self.height - 1)
+    @classmethod
+    def from_layout(cls, track, layout, keepout=60, image_path="assets/cone.png", cell_size=None):
+        """ConeManager dengan cone di posisi yang sudah diketahui ([x, y, radius]
+        per cone), tanpa penempatan acak (replay, viewer stream)."""
+        radius = layout[0][2] if layout else 10
+        mgr = cls(track, n=0, radius=radius, keepout=keepout, image_path=image_path, cell_size=cell_size)
+        mgr.n = len(layout)
+        mgr.cones = [Cone((x, y), radius=r) for x, y, r in layout]
+        mgr.rebuild_grid()
+        return mgr
 
-            if not self.track.is_road(x, y):
-                continue
+    def rebuild_grid(self):
+        """Bangun ulang grid dari posisi cone sekarang (cone hanya pindah saat shuffle)."""
+        cs = self.cell_size
+        self.grid = {}
+        self.version += 1
+        self.max_cone_radius = max((c.radius for c in self.cones), default=0)
+        for c in self.cones:
+            key = (int(c.pos.x // cs), int(c.pos.y // cs))
+            self.grid.setdefault(key, []).append(c)
 
-            ok = True
-            for car in cars:
-                if car.pos.distance_to((x, y)) < self.keepout:
-                    ok = False
-                    break
+    def cones_near(self, x, y, r):
+        """Cone yang lingkarannya berjarak <= r dari point (x,y)."""
+        cs = self.cell_size
+        reach = r + self.max_cone_radius
+        x0, x1 = int((x - reach) // cs), int((x + reach) // cs)
+        y0, y1 = int((y - reach) // cs), int((y + reach) // cs)
+        out = []
+        for gx in range(x0, x1 + 1):
+            for gy in range(y0, y1 + 1):
+                for c in self.grid.get((gx, gy), ()):
+                    dx = c.pos.x - x
+                    dy = c.pos.y - y
+                    lim = r + c.radius
+                    if dx * dx + dy * dy <= lim * lim:
+                        out.append(c)
+        return out
+
+    def cones_on_segment(self, x0, y0, x1, y1, r=0.0):
+        """Cone yang lingkarannya (diperbesar r) memotong segmen (x0,y0)-(x1,y1)."""
+        cs = self.cell_size
+        dx, dy = x1 - x0, y1 - y0
+        length = math.hypot(dx, dy)
+        # jalan di sepanjang segmen per satu cell; setiap titik segmen berjarak
+        # <= cs/2 dari titik jalan, jadi cukup cek k cell tetangga
+        k = math.ceil((r + self.max_cone_radius) / cs + 0.5)
+        n = int(length // cs) + 1
+        if (n + 1) * (2 * k + 1) ** 2 >= len(self.grid):
+            # cone sedikit: lebih murah cek semua cell yang terisi
+            cells = self.grid.keys()
+        else:
+            cells = set()
+            for i in range(n + 1):
+                t = min(i * cs, length)
+                gx = int((x0 + dx * t / length) // cs) if length else int(x0 // cs)
+                gy = int((y0 + dy * t / length) // cs) if length else int(y0 // cs)
+                for ox in range(-k, k + 1):
+                    for oy in range(-k, k + 1):
+                        cells.add((gx + ox, gy + oy))
+
+        out = []
+        len_sq = dx * dx + dy * dy
+        for key in cells:
+            for c in self.grid.get(key, ()):
+                # jarak pusat cone ke segmen
+                t = 0.0
+                if len_sq > 0:
+                    t = min(max(((c.pos.x - x0) * dx + (c.pos.y - y0) * dy) / len_sq, 0.0), 1.0)
+                ex = x0 + dx * t - c.pos.x
+                ey = y0 + dy * t - c.pos.y
+                lim = r + c.radius
+                if ex * ex + ey * ey <= lim * lim:
+                    out.append(c)
+        return out
 
-            if ok:
-                return (x, y)
+    def _random_road_pos(self):
+        """Pixel jalan acak (uniform), langsung dari indeks flat Track.road_index"""
+        road = self.track.road_index
+        idx = int(road[self.rng.randrange(len(road))])
+        return (idx % self.width, idx // self.width)
 
-        return (self.width // 2, self.height // 2)
+    def _place(self, cars):
+        """
+        Posisi untuk n cone dengan Poisson-disk (dart throwing): jarak antar
+        cone >= min_spacing dan jarak ke setiap mobil >= keepout, dicek lewat
+        grid sehingga tiap kandidat O(1). Raise ConePlacementError jika satu
+        cone gagal ditempatkan dalam max_tries percobaan.
+        """
+        if self.n and not len(self.track.road_index):
+            raise ConePlacementError("Track tidak punya pixel jalan")
+        spaced = _PointGrid(self.min_spacing)
+        blocked = _PointGrid(self.keepout)
+        for car in cars:
+            blocked.add(car.pos.x, car.pos.y)
+
+        out = []
+        for i in range(self.n):
+            for _ in range(self.max_tries):
+                x, y = self._random_road_pos()
+                if not spaced.near(x, y) and not blocked.near(x, y):
+                    break
+            else:
+                raise ConePlacementError(
+                    f"Gagal menempatkan cone {i + 1}/{self.n} dalam {self.max_tries} percobaan "
+                    f"(min_spacing={self.min_spacing}, keepout={self.keepout})"
+                )
+            spaced.add(x, y)
+            out.append((x, y))
+        return out
 
     def shuffle(self, cars=None):
         """Pindahkan semua cone ke posisi acak baru (dipakai antar-race)."""
-        cars = cars or []
-        for c in self.cones:
-            c.pos.update(self._random_road_pos(cars))
+        for c, pos in zip(self.cones, self._place(cars or [])):
+            c.pos.update(pos)
+        self.rebuild_grid()
 
     def draw(self, screen):
         if self.cone_img:
@@ -77,9 +213,11 @@ class ConeManager:
 
     def collide_car(self, car):
         car_r = getattr(car, "hit_radius", 12)
-        for c in self.cones:
-            # Kurangi area deteksi lebih banyak untuk mengurangi false positive
-            collision_threshold = (car_r + c.radius) * 0.70  # 70% dari radius total
-            if car.pos.distance_to(c.pos) <= collision_threshold:
+        # Kurangi area deteksi lebih banyak untuk mengurangi false positive
+        # (70% dari radius total), kandidat diambil dari grid
+        reach = (car_r + self.max_cone_radius) * 0.70
+        for c in self.cones_near(car.pos.x, car.pos.y, reach):
+            collision_threshold = (car_r + c.radius) * 0.70
+            if car.pos.distance_squared_to(c.pos) <= collision_threshold * collision_threshold:
                 return True
         return False
@@ -0,0 +1,419 @@
+# fleet.py
+"""Fleet engine: simulasi N mobil dengan state structure-of-arrays (NumPy).
+
+Semua state mobil (posisi, heading, kecepatan, cooldown, lap, metrics)
+disimpan sebagai array berukuran N, dan tiap langkah (sensor, kinematika
+Car.update, tabrakan dinding/cone/mobil, hitungan lap) dijalankan vectorized
+untuk semua mobil sekaligus. Hanya controller.act yang tetap per mobil karena
+controller menyimpan state sendiri; untuk controller fuzzy LUT hanya bagian
+recover (stuck/mundur) yang per mobil, lookup LUT-nya satu lookup_many.
+
+Beda dengan Race: semua mobil membaca sensor dari state awal langkah yang
+sama (simultan), bukan bergantian RED lalu BLUE.
+
+Contoh:
+    python fleet.py --cars 100            # visual
+    python fleet.py --cars 200 --headless # ukur langkah/detik
+"""
+
+import argparse
+import itertools
+import math
+import time
+
+import numpy as np
+
+from car import Car, ACCEL, BRAKE_ACCEL, DRAG, DRAG_HZ, STEER_RATE, WALL_MARGIN
+from cones import ConeManager
+from fuzzy_controller import FuzzyController
+from track import Track
+from progress import progress_for
+from race import (
+    make_controller, default_start_line, default_start_poses, FixedTimestep, CONTROLLER_KINDS, PHYSICS_HZ,
+    SENSOR_LEN, MAX_SPEED, FINISH_LAPS,
+    CONE_COUNT, CONE_RADIUS, CONE_KEEPOUT, CONE_SPACING,
+)
+
+TRACK_IMAGE = "assets/track_nascar.png"
+
+# urutan sensor sama dengan Car.sensor_angles, ditambah front_long di akhir
+SENSOR_ANGLES = [-90, -70, -40, -20, 0, 20, 40, 70, 90]
+RAY_STEP = 3
+NEAREST_CARS = 4  # jumlah mobil lain terdekat yang dicek sebagai obstacle sensor
+
+
+def grid_start_poses(track, n, origin=(520, 110), heading=0.0, spacing=(26, 20), clearance=12):
+    """Posisi start grid di sekitar origin: kolom diurutkan dari yang terdekat
+    (di belakang dulu, lalu di depan), lajur bergeser ke kiri/kanan.
+    Posisi yang terlalu dekat tepi jalan dilewati."""
+    ox, oy = origin
+    fx, fy = math.cos(heading), math.sin(heading)
+    rx, ry = -fy, fx
+    poses = []
+    for col in sorted(range(-200, 200), key=lambda c: (abs(c), c < 0)):
+        for lane in range(-8, 9):
+            x = ox - fx * col * spacing[0] + rx * lane * spacing[1]
+            y = oy - fy * col * spacing[0] + ry * lane * spacing[1]
+            if track.road_distance(x, y) >= clearance:
+                poses.append((x, y, heading))
+                if len(poses) == n:
+                    return poses
+    raise ValueError(f"Tidak cukup ruang start untuk {n} mobil")
+
+
+class Fleet:
+    """State N mobil sebagai array + langkah simulasi vectorized"""
+
+    def __init__(self, track, cones, start_poses, controllers="rule", laps=FINISH_LAPS, sensor_len=SENSOR_LEN,
+                 start_line=None):
+        self.track = track
+        self.cones = cones
+        self.laps = laps
+        self.start_line = start_line or default_start_line(track)
+        self.n = n = len(start_poses)
+        self.sensor_len = sensor_len
+
+        poses = np.asarray(start_poses, dtype=np.float64)
+        self.x = poses[:, 0].copy()
+        self.y = poses[:, 1].copy()
+        self.heading = poses[:, 2].copy()
+        # pose langkah sebelumnya, untuk interpolasi render (seperti Car.prev_pos)
+        self.prev_x = self.x.copy()
+        self.prev_y = self.y.copy()
+        self.prev_heading = self.heading.copy()
+        self.vel = np.zeros(n)
+        self.steer = np.zeros(n)
+
+        # parameter fisika sama dengan Car
+        self.max_speed = MAX_SPEED
+        self.accel = ACCEL
+        self.brake_accel = BRAKE_ACCEL
+        self.drag = DRAG
+        self.hit_radius = 12
+        self.align_heading = True
+
+        self.cone_hit_cooldown = np.zeros(n)
+        self.car_hit_cooldown = np.zeros(n)
+        self.lap_count = np.zeros(n, dtype=np.int64)
+        # progress kumulatif sepanjang centerline (lihat progress.py)
+        self.track_progress = progress_for(track, self.start_line, (self.x.mean(), self.y.mean()))
+        self.progress = np.array([self.track_progress.start(x, y) for x, y in zip(self.x, self.y)])
+        self.finished = np.zeros(n, dtype=bool)
+
+        # metrics (sama dengan Metrics: t, coll, corr, finish_time)
+        self.t = np.zeros(n)
+        self.coll = np.zeros(n, dtype=np.int64)
+        self.corr = np.zeros(n, dtype=np.int64)
+        self.finish_time = np.zeros(n)
+
+        if isinstance(controllers, str):
+            controllers = [controllers] * n
+        self.controllers = [make_controller(c, track, self.track_progress) for c in controllers]
+
+        # ray: 9 sensor + front_long, offset sudut dan panjang per ray
+        self.ray_offsets = np.radians(np.array(SENSOR_ANGLES + [0], dtype=np.float64))
+        self.ray_lens = np.array([sensor_len] * len(SENSOR_ANGLES) + [sensor_len * 1.5])
+        self.ray_ends = self.ray_lens.astype(np.int64)
+        self.samples = np.arange(0, self.ray_ends.max(), RAY_STEP)
+        self.sensors = np.zeros((n, len(self.ray_lens)))
+
+        self._free = None
+        self._cones_version = None
+        self._views = None
+
+    # ---------------- SENSOR ----------------
+    def _free_raster(self):
+        """Raster pixel bebas (bool, [y, x]): jalan dan tidak kena cone mana pun.
+
+        Pixel p kena cone jika |c - p|^2 <= r^2; karena sample ray selalu
+        pixel integer, lookup raster identik dengan cek jarak ke setiap cone.
+        Dibangun ulang hanya saat layout cone berubah."""
+        if self._cones_version != self.cones.version:
+            h, w = self.track.road_mask.shape
+            free = self.track.road_mask.copy()
+            for c in self.cones.cones:
+                r = c.radius
+                x0, x1 = max(int(c.pos.x - r) - 1, 0), min(int(c.pos.x + r) + 2, w)
+                y0, y1 = max(int(c.pos.y - r) - 1, 0), min(int(c.pos.y + r) + 2, h)
+                if x0 >= x1 or y0 >= y1:
+                    continue
+                gx, gy = np.meshgrid(np.arange(x0, x1), np.arange(y0, y1))
+                dx = c.pos.x - gx
+                dy = c.pos.y - gy
+                free[y0:y1, x0:x1] &= dx * dx + dy * dy > r * r
+            self._free = free
+            self._cones_version = self.cones.version
+        return self._free
+
+    def read_sensors(self):
+        """Cast semua ray semua mobil sekaligus: array (N, ray, sample)"""
+        angs = self.heading[:, None] + self.ray_offsets[None, :]
+        d = self.samples
+        px = (self.x[:, None, None] + np.cos(angs)[..., None] * d).astype(np.intp)
+        py = (self.y[:, None, None] + np.sin(angs)[..., None] * d).astype(np.intp)
+
+        # 1) tepi jalan + 2) cone, satu gather. Tepi gambar di road_mask selalu
+        # False, jadi sample di luar gambar yang di-clip tetap terhitung "bukan jalan"
+        h, w = self.track.road_mask.shape
+        free = self._free_raster()
+        blocked = ~free[np.clip(py, 0, h - 1), np.clip(px, 0, w - 1)]
+
+        # 3) mobil lain: hanya K mobil terdekat yang masih dalam jangkauan ray
+        if self.n > 1:
+            ddx = self.x[None, :] - self.x[:, None]
+            ddy = self.y[None, :] - self.y[:, None]
+            dist = np.hypot(ddx, ddy)
+            np.fill_diagonal(dist, np.inf)
+            k = min(NEAREST_CARS, self.n - 1)
+            near = np.argpartition(dist, k - 1, axis=1)[:, :k]
+            reach = self.ray_lens.max() + 2 * self.hit_radius + 2
+            in_range = np.take_along_axis(dist, near, axis=1) <= reach
+            total_r = 2 * self.hit_radius
+            for j in range(k):
+                rows = np.nonzero(in_range[:, j])[0]
+                if not len(rows):
+                    continue
+                o = near[rows, j]
+                dx = self.x[o][:, None, None] - px[rows]
+                dy = self.y[o][:, None, None] - py[rows]
+                blocked[rows] |= dx * dx + dy * dy <= total_r * total_r
+
+        blocked &= d[None, None, :] < self.ray_ends[None, :, None]
+        first = blocked.argmax(axis=2)
+        any_hit = np.take_along_axis(blocked, first[..., None], axis=2)[..., 0]
+        self.sensors = np.where(any_hit, d[first], self.ray_lens[None, :])
+        return self.sensors
+
+    def sensor_dict(self, i, dt=None):
+        """Sensor mobil ke-i dalam format dict Car.read_sensors (plus dt jika diberikan)"""
+        # float Python (bukan skalar NumPy): aritmetika controller jauh lebih murah
+        dists = self.sensors[i].tolist()
+        left = min(dists[1], dists[2])
+        right = min(dists[6], dists[7])
+        s = {
+            "far_left": dists[0],
+            "left": left,
+            "lmid": dists[3],
+            "front": dists[4],
+            "front_long": dists[9],
+            "rmid": dists[5],
+            "right": right,
+            "far_right": dists[8],
+            "bias": right - left,
+            "speed": float(self.vel[i]),
+            "x": float(self.x[i]),
+            "y": float(self.y[i]),
+            "heading": float(self.heading[i]),
+        }
+        if dt is not None:
+            s["dt"] = dt
+        return s
+
+    # ---------------- FISIKA ----------------
+    def _update(self, dt, steer, throttle, brake, active):
+        """Kinematika Car.update untuk semua mobil aktif"""
+        self.cone_hit_cooldown = np.where(self.cone_hit_cooldown > 0, self.cone_hit_cooldown - dt, self.cone_hit_cooldown)
+        self.car_hit_cooldown = np.where(self.car_hit_cooldown > 0, self.car_hit_cooldown - dt, self.car_hit_cooldown)
+
+        heading = self.heading + steer * STEER_RATE * dt
+        vel = self.vel + throttle * self.accel * dt - brake * self.brake_accel * dt
+        vel = np.clip(vel * self.drag ** (dt * DRAG_HZ), 0, self.max_speed)
+        x = self.x + np.cos(heading) * vel * dt
+        y = self.y + np.sin(heading) * vel * dt
+
+        self.heading = np.where(active, heading, self.heading)
+        self.vel = np.where(active, vel, self.vel)
+        self.x = np.where(active, x, self.x)
+        self.y = np.where(active, y, self.y)
+
+    def _collide_wall(self, active):
+        """Car.collide_wall vectorized: lookup pixel jalan terdekat + luruskan heading"""
+        hit = active & ~self.track.is_road_many(self.x, self.y)
+        idx = np.nonzero(hit)[0]
+        if len(idx):
+            self.vel[idx] *= 0.5
+            rx, ry, nx, ny = self.track.nearest_road_many(self.x[idx], self.y[idx])
+            px = rx + 0.5 + nx * WALL_MARGIN
+            py = ry + 0.5 + ny * WALL_MARGIN
+            inside = self.track.is_road_many(px, py)
+            self.x[idx] = np.where(inside, px, rx + 0.5)
+            self.y[idx] = np.where(inside, py, ry + 0.5)
+            if self.align_heading:
+                h = self.heading[idx]
+                tx, ty = -ny, nx
+                flip = np.cos(h) * tx + np.sin(h) * ty < 0
+                tx, ty = np.where(flip, -tx, tx), np.where(flip, -ty, ty)
+                delta = (np.arctan2(ty, tx) - h + math.pi) % (2 * math.pi) - math.pi
+                self.heading[idx] = np.where((nx != 0) | (ny != 0), h + delta, h)
+        return hit
+
+    def _collide_cones(self, active):
+        """ConeManager.collide_car vectorized + efek cooldown"""
+        cones = self.cones.cones
+        ready = active & (self.cone_hit_cooldown <= 0)
+        if not cones or not ready.any():
+            return np.zeros(self.n, dtype=bool)
+        cx = np.array([c.pos.x for c in cones])
+        cy = np.array([c.pos.y for c in cones])
+        thr = (self.hit_radius + np.array([c.radius for c in cones])) * 0.70
+        dx = self.x[:, None] - cx[None, :]
+        dy = self.y[:, None] - cy[None, :]
+        hit = ready & (dx * dx + dy * dy <= thr * thr).any(axis=1)
+        self.vel[hit] *= 0.4
+        self.cone_hit_cooldown[hit] = 1.0
+        return hit
+
+    def _collide_cars(self):
+        """Tabrakan antar mobil dengan cooldown (pasangan diproses berurutan)"""
+        if self.n < 2:
+            return np.zeros(self.n, dtype=bool)
+        min_d = 2 * self.hit_radius
+        dx = self.x[:, None] - self.x[None, :]
+        dy = self.y[:, None] - self.y[None, :]
+        close = np.triu(dx * dx + dy * dy < min_d * min_d, k=1)
+        hit = np.zeros(self.n, dtype=bool)
+        for i, j in zip(*np.nonzero(close)):
+            if self.car_hit_cooldown[i] > 0 or self.car_hit_cooldown[j] > 0:
+                continue
+            self.car_hit_cooldown[i] = self.car_hit_cooldown[j] = 1.5
+            self.vel[i] *= 0.3
+            self.vel[j] *= 0.3
+            hit[i] = hit[j] = True
+        return hit
+
+    def step(self, dt):
+        """Satu langkah simulasi semua mobil"""
+        active = ~self.finished
+        self.prev_x, self.prev_y, self.prev_heading = self.x.copy(), self.y.copy(), self.heading.copy()
+        self.read_sensors()
+
+        steer = np.zeros(self.n)
+        throttle = np.zeros(self.n)
+        brake = np.zeros(self.n)
+        # controller fuzzy LUT: recover per mobil, sisanya dikumpulkan per engine
+        batches = {}
+        for i in np.nonzero(active)[0]:
+            ctrl = self.controllers[i]
+            s = self.sensor_dict(i, dt)
+            if isinstance(ctrl, FuzzyController) and ctrl.engine is not None:
+                x = ctrl.inputs(s)
+                out = ctrl.recover(s, x)
+                if out is None:
+                    batches.setdefault(ctrl.engine, []).append((i, x))
+                    continue
+            else:
+                out = ctrl.act(s)
+            steer[i], throttle[i], brake[i] = out
+        for engine, items in batches.items():
+            rows = [i for i, _ in items]
+            # fromiter jauh lebih cepat dari np.array(list of tuple)
+            xs = np.fromiter(itertools.chain.from_iterable(x for _, x in items), np.float64, 6 * len(items))
+            out = engine.lookup_many(xs.reshape(-1, 6))
+            steer[rows], throttle[rows], brake[rows] = out[:, 0], out[:, 1], out[:, 2]
+
+        self._update(dt, steer, throttle, brake, active)
+        collided = self._collide_wall(active) | self._collide_cones(active)
+
+        # metrics (Metrics.update)
+        self.t = np.where(active, self.t + dt, self.t)
+        self.coll += active & collided
+        self.corr += active & (np.abs(steer - self.steer) > 0.35)
+        self.steer = np.where(active, steer, self.steer)
+
+        # lap: progress kumulatif melewati kelipatan panjang lap
+        prog = self.track_progress
+        self.progress = np.where(active, prog.advance_many(self.progress, self.x, self.y), self.progress)
+        crossed = active & (self.progress >= (self.lap_count + 1) * prog.length)
+        self.lap_count += crossed
+        done = crossed & (self.lap_count >= self.laps)
+        self.finish_time = np.where(done, self.t, self.finish_time)
+        self.finished |= done
+
+        # tabrakan antar mobil dihitung seperti met.update(dt, True, 0) di Race
+        car_hit = self._collide_cars()
+        self.t = np.where(car_hit & active, self.t + dt, self.t)
+        self.coll += car_hit
+        self.corr += car_hit & (np.abs(self.steer) > 0.35)
+        self.steer = np.where(car_hit, 0.0, self.steer)
+
+    # ---------------- VIEW ----------------
+    def views(self, colors=None):
+        """Object Car sebagai view tipis untuk draw, disinkronkan dari array"""
+        if self._views is None:
+            colors = colors or [(220, 40, 40), (40, 130, 235), (240, 200, 40), (60, 200, 90)]
+            self._views = [
+                Car((self.x[i], self.y[i]), colors[i % len(colors)], self.track, f"Car {i}",
+                    sensor_len=self.sensor_len)
+                for i in range(self.n)
+            ]
+        for i, car in enumerate(self._views):
+            car.pos.update(self.x[i], self.y[i])
+            car.heading = float(self.heading[i])
+            car.prev_pos.update(self.prev_x[i], self.prev_y[i])
+            car.prev_heading = float(self.prev_heading[i])
+            car.vel = float(self.vel[i])
+            car.lap_count = int(self.lap_count[i])
+            car.finished = bool(self.finished[i])
+        return self._views
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulasi N mobil (fleet engine)")
+    parser.add_argument("--track", default=TRACK_IMAGE)
+    parser.add_argument("--cars", type=int, default=100)
+    parser.add_argument("--controller", default="rule", choices=CONTROLLER_KINDS)
+    parser.add_argument("--cones", type=int, default=CONE_COUNT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--headless", action="store_true", help="tanpa window, cetak langkah/detik")
+    parser.add_argument("--steps", type=int, default=600, help="jumlah langkah (mode headless)")
+    parser.add_argument("--physics-hz", type=int, default=PHYSICS_HZ,
+                        help="frekuensi langkah fisika tetap (terlepas dari FPS render)")
+    args = parser.parse_args()
+
+    import pygame
+
+    track = Track(args.track)
+    screen = None
+    if not args.headless:
+        pygame.init()
+        screen = pygame.display.set_mode(track.surface.get_size())
+        pygame.display.set_caption(f"Fleet — {args.cars} cars")
+    cones = ConeManager(track, n=args.cones, radius=CONE_RADIUS, keepout=CONE_KEEPOUT, min_spacing=CONE_SPACING,
+                        image_path=None if args.headless else "assets/cone.png", seed=args.seed)
+    x0, y0, heading = default_start_poses(track)[0]
+    fleet = Fleet(track, cones, grid_start_poses(track, args.cars, (x0, y0), heading), controllers=args.controller)
+
+    if args.headless:
+        t0 = time.perf_counter()
+        for _ in range(args.steps):
+            fleet.step(1.0 / args.physics_hz)
+        elapsed = time.perf_counter() - t0
+        print(f"{args.cars} mobil: {args.steps / elapsed:.1f} langkah/detik "
+              f"({elapsed / args.steps * 1000:.2f} ms/langkah)")
+        return
+
+    clock = pygame.time.Clock()
+    font = pygame.font.SysFont(None, 22)
+    running = True
+    # fisika berjalan dengan langkah tetap seperti mode headless; render diinterpolasi
+    stepper = FixedTimestep(args.physics_hz, max_steps=8)
+    while running:
+        frame_dt = clock.tick(60) / 1000.0
+        for e in pygame.event.get():
+            if e.type == pygame.QUIT or (e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE):
+                running = False
+        for _ in range(stepper.steps(frame_dt)):
+            fleet.step(stepper.dt)
+
+        track.draw(screen)
+        cones.draw(screen)
+        for car in fleet.views():
+            car.draw(screen, alpha=stepper.alpha)
+        txt = f"{fleet.n} cars | max lap {fleet.lap_count.max()} | {clock.get_fps():.0f} FPS"
+        screen.blit(font.render(txt, True, (255, 255, 255)), (20, 20))
+        pygame.display.flip()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
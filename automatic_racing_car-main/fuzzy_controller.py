@@ -5,65 +5,105 @@ Fitur Utama:
 1. Indecision Breaker: Memaksa belok jika sensor kiri & kanan seimbang tapi depan buntu.
 2. Dynamic Sensitivity: Setir jadi sangat sensitif saat pelan (untuk manuver cone).
 3. Safety Speed: Melambat otomatis saat mendekati rintangan.
+
+Jika `engine` (FuzzyEngine dari fuzzy_engine.py) diberikan, langkah 3-4
+diganti lookup control surface LUT hasil kompilasi rule base di config.
+Fleet memanggil inputs + recover per mobil, lalu satu engine.lookup_many
+untuk semua mobil sekaligus.
 """
 
 from utils import clamp
 
+# Timer mundur darurat dalam detik (dulu 30 dan 40 frame pada 60 FPS)
+STUCK_TIME = 0.5
+REVERSE_TIME = 40 / 60
+DEFAULT_DT = 1.0 / 60.0
+# toleransi akumulasi float, agar pada 60 Hz jumlah frame sama persis
+_EPS = 1e-9
+
 class FuzzyController:
-    def __init__(self, sensor_len=320, max_speed=900):
+    def __init__(self, sensor_len=320, max_speed=900, engine=None):
         self.sensor_len = sensor_len
         self.max_speed = max_speed
+        self.engine = engine
         
-        # Variabel untuk logika mundur darurat
-        self.stuck_timer = 0
+        # Variabel untuk logika mundur darurat (detik)
+        self.stuck_time = 0.0
         self.reversing = False
-        self.reverse_frame = 0
+        self.reverse_time = 0.0
 
-    def act(self, s):
-        # ===========================
-        # 1. NORMALISASI SENSOR
-        # ===========================
+    def inputs(self, s):
+        """
+        Input fuzzy (F, LM, RM, L, R, V) = sensor / jangkauan, belum di-clamp:
+        FuzzyEngine.lookup / lookup_many clamp sendiri, jadi jalur LUT tidak
+        perlu membayar clamp dua kali.
+        """
         # 0.0 = Nempel (Bahaya), 1.0 = Jauh (Aman)
-        
-        # Sensor Depan
-        F = clamp(s["front"] / self.sensor_len, 0.0, 1.0)
-        
-        # Sensor Diagonal (Cone Detector)
-        LM = clamp(s["lmid"] / self.sensor_len, 0.0, 1.0)
-        RM = clamp(s["rmid"] / self.sensor_len, 0.0, 1.0)
-        
-        # Sensor Samping (Wall Detector)
-        L = clamp(s["left"] / self.sensor_len, 0.0, 1.0)
-        R = clamp(s["right"] / self.sensor_len, 0.0, 1.0)
+        n = self.sensor_len
+        return (
+            s["front"] / n,  # Sensor Depan
+            s["lmid"] / n,   # Sensor Diagonal (Cone Detector)
+            s["rmid"] / n,
+            s["left"] / n,   # Sensor Samping (Wall Detector)
+            s["right"] / n,
+            abs(s["speed"]) / self.max_speed,  # Speed
+        )
 
-        # Speed
-        current_vel = s["speed"]
-        V = clamp(abs(current_vel) / self.max_speed, 0.0, 1.0)
+    def recover(self, s, x):
+        """
+        Logika mundur darurat (menyimpan state). Mengembalikan (steer,
+        throttle, brake) jika recovery mengambil alih, atau None jika
+        keputusan diserahkan ke rule / LUT. Fleet memanggil ini per mobil
+        lalu lookup LUT semua mobil sekaligus.
+        """
+        # langkah waktu simulasi (diisi Race.step / Fleet.step)
+        dt = s.get("dt", DEFAULT_DT)
 
-        # ===========================
-        # 2. EMERGENCY RECOVERY (MUNDUR)
-        # ===========================
         # Jika sedang mode mundur
         if self.reversing:
-            self.reverse_frame -= 1
-            if self.reverse_frame <= 0:
+            self.reverse_time -= dt
+            if self.reverse_time <= _EPS:
                 self.reversing = False
-                self.stuck_timer = 0
+                self.stuck_time = 0.0
             # Setir dibalik saat mundur
             rev_steer = -1.0 if s["left"] < s["right"] else 1.0
             return rev_steer, -1.0, 0.0
 
-        # Cek Stuck: Gas ditekan tapi mobil diam
-        if abs(current_vel) < 10 and (F < 0.2 or LM < 0.2 or RM < 0.2):
-            self.stuck_timer += 1
+        # Cek Stuck: Gas ditekan tapi mobil diam (x belum di-clamp, tapi
+        # x < 0.2 sama saja dengan clamp(x) < 0.2)
+        if abs(s["speed"]) < 10 and (x[0] < 0.2 or x[1] < 0.2 or x[2] < 0.2):
+            self.stuck_time += dt
         else:
-            self.stuck_timer = 0
+            self.stuck_time = 0.0
             
         # Jika stuck > 0.5 detik, aktifkan mundur
-        if self.stuck_timer > 30:
+        if self.stuck_time > STUCK_TIME + _EPS:
             self.reversing = True
-            self.reverse_frame = 40 
+            self.reverse_time = REVERSE_TIME
             return 0.0, 0.0, 0.0
+        return None
+
+    def act(self, s):
+        # ===========================
+        # 1. NORMALISASI SENSOR
+        # ===========================
+        x = self.inputs(s)
+
+        # ===========================
+        # 2. EMERGENCY RECOVERY (MUNDUR)
+        # ===========================
+        out = self.recover(s, x)
+        if out is not None:
+            return out
+
+        # Backend LUT: rule base dari config, cukup satu lookup tabel
+        if self.engine is not None:
+            return self.engine.lookup(x)
+
+        # jalur rule: input di-clamp ke [0, 1]
+        F, LM, RM, L, R, V = x
+        F, LM, RM = clamp(F, 0.0, 1.0), clamp(LM, 0.0, 1.0), clamp(RM, 0.0, 1.0)
+        L, R, V = clamp(L, 0.0, 1.0), clamp(R, 0.0, 1.0), clamp(V, 0.0, 1.0)
 
         # ===========================
         # 3. STEERING LOGIC (ANTI-BIMBANG)
@@ -0,0 +1,208 @@
+# fuzzy_engine.py
+"""
+Fuzzy Inference Engine berbasis data + Lookup Table (LUT)
+
+Membership function dan rule untuk input F, LM, RM, L, R, V dideklarasikan
+di file JSON (lihat fuzzy_rules.json), bukan di kode. Engine (Sugeno orde-0,
+AND = min, defuzzifikasi = rata-rata berbobot per output) dievaluasi sekali
+di seluruh grid input lalu disimpan sebagai control surface multi-dimensi
+(.npy di samping file config). Saat balapan, act cukup lookup tabel
+(nearest atau interpolasi multilinear).
+"""
+
+import hashlib
+import itertools
+from bisect import bisect_right
+import json
+import os
+import tempfile
+
+import numpy as np
+
+INPUTS = ("F", "LM", "RM", "L", "R", "V")
+OUTPUTS = ("steer", "throttle", "brake")
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fuzzy_rules.json")
+
+
+def membership(x, shape, params):
+    """Derajat keanggotaan x (array) untuk fungsi "tri" (a,b,c) atau "trap" (a,b,c,d)"""
+    x = np.asarray(x, dtype=np.float64)
+    if shape == "tri":
+        a, b, c = params
+        params = (a, b, b, c)
+    elif shape != "trap":
+        raise ValueError(f"Membership function tidak dikenal: {shape}")
+    a, b, c, d = params
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rise = np.where(b > a, (x - a) / (b - a), 1.0)
+        fall = np.where(d > c, (d - x) / (d - c), 1.0)
+    mu = np.minimum(rise, fall)
+    # bahu kiri/kanan: di luar [a, d] nol, kecuali a == b atau c == d di ujung
+    mu = np.where((x < a) | (x > d), 0.0, mu)
+    return np.clip(mu, 0.0, 1.0)
+
+
+class FuzzyEngine:
+    """Rule base fuzzy dari config + control surface LUT hasil kompilasi"""
+
+    def __init__(self, config, resolution=9, interpolation="linear"):
+        if interpolation not in ("linear", "nearest"):
+            raise ValueError(f"Interpolasi tidak dikenal: {interpolation}")
+        self.config = config
+        self.resolution = int(resolution)
+        self.interpolation = interpolation
+        self.default = [float(config.get("default", {}).get(o, 0.0)) for o in OUTPUTS]
+        self.table = None  # lihat setter: sekaligus membuat view flat untuk lookup skalar
+
+        # offset 2^6 sudut hypercube untuk interpolasi multilinear
+        corners = np.array(list(itertools.product((0, 1), repeat=len(INPUTS))))
+        strides = np.array([self.resolution ** (len(INPUTS) - 1 - i) for i in range(len(INPUTS))])
+        self._corners = corners
+        self._corner_offsets = corners @ strides
+        self._strides = strides
+        # versi list untuk lookup skalar, sudah dikali 3 (index ke table flat)
+        self._flat_strides = [3 * int(v) for v in strides]
+        self._flat_offsets = [3 * int(v) for v in self._corner_offsets]
+        # batas antar titik grid (tengah dua titik): index nearest = jumlah
+        # batas <= x, sekaligus clamp ke [0, resolution-1]
+        top = self.resolution - 1
+        self._midpoints = [(k - 0.5) / top for k in range(1, self.resolution)]
+        self._midpoint_arr = np.array(self._midpoints)
+
+    @property
+    def table(self):
+        """Control surface (resolution^6, 3) float32"""
+        return self._table
+
+    @table.setter
+    def table(self, table):
+        self._table = table
+        # view flat (memoryview float32): lookup skalar cukup index Python, tanpa NumPy
+        self._flat = None
+        if table is not None:
+            self._flat = memoryview(np.ascontiguousarray(table, dtype=np.float32)).cast("B").cast("f")
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_CONFIG, resolution=9, interpolation="linear", cache=True):
+        """Load config JSON, lalu load LUT dari .npy (atau compile dan simpan)"""
+        with open(path) as f:
+            text = f.read()
+        engine = cls(json.loads(text), resolution, interpolation)
+
+        # nama cache memuat hash config + resolusi, jadi edit rule = LUT baru
+        digest = hashlib.sha1(f"{text}|{engine.resolution}".encode()).hexdigest()[:10]
+        stem = os.path.splitext(path)[0]
+        lut_path = f"{stem}.lut{engine.resolution}.{digest}.npy"
+
+        if cache and os.path.exists(lut_path):
+            engine.table = np.load(lut_path)
+        else:
+            engine.compile()
+            if cache:
+                # tulis ke file sementara lalu rename: proses lain (worker
+                # tournament) tidak pernah melihat file setengah jadi
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(lut_path) or ".", suffix=".npy")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        np.save(f, engine.table)
+                    os.replace(tmp, lut_path)
+                except BaseException:
+                    os.unlink(tmp)
+                    raise
+        engine.lut_path = lut_path
+        return engine
+
+    def infer(self, X):
+        """Evaluasi rule base langsung (tanpa LUT) untuk X berbentuk (N, 6)"""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        cols = {name: X[:, i] for i, name in enumerate(INPUTS)}
+        terms = self.config["inputs"]
+
+        num = np.zeros((len(X), len(OUTPUTS)))
+        den = np.zeros((len(X), len(OUTPUTS)))
+        mu_cache = {}
+        for rule in self.config["rules"]:
+            w = np.ones(len(X))
+            for var, term in rule["if"].items():
+                key = (var, term)
+                if key not in mu_cache:
+                    shape, params = terms[var][term]
+                    mu_cache[key] = membership(cols[var], shape, params)
+                w = np.minimum(w, mu_cache[key])
+            w = w * rule.get("weight", 1.0)
+            for j, out in enumerate(OUTPUTS):
+                if out in rule["then"]:
+                    num[:, j] += w * rule["then"][out]
+                    den[:, j] += w
+
+        default = np.array(self.default)
+        return np.where(den > 1e-9, num / np.maximum(den, 1e-9), default)
+
+    def compile(self):
+        """Hitung control surface di grid resolution^6 titik di [0, 1]^6"""
+        axis = np.linspace(0.0, 1.0, self.resolution)
+        grid = np.stack(np.meshgrid(*([axis] * len(INPUTS)), indexing="ij"), axis=-1)
+        flat = grid.reshape(-1, len(INPUTS))
+
+        # evaluasi per blok agar memori sementara tetap kecil
+        out = np.empty((len(flat), len(OUTPUTS)), dtype=np.float32)
+        block = 65536
+        for i in range(0, len(flat), block):
+            out[i:i + block] = self.infer(flat[i:i + block])
+        self.table = out
+        return self.table
+
+    def lookup_many(self, X):
+        """Lookup LUT untuk X berbentuk (N, 6), hasil (N, 3) steer/throttle/brake"""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        if self.interpolation == "nearest":
+            # side="right" = bisect_right di lookup skalar (clamp ikut di sini)
+            idx = np.searchsorted(self._midpoint_arr, X, side="right") @ self._strides
+            return self.table[idx].astype(np.float64)
+
+        pos = np.clip(X, 0.0, 1.0) * (self.resolution - 1)
+
+        base = np.minimum(pos.astype(np.intp), self.resolution - 2)
+        frac = pos - base
+        flat = base @ self._strides
+        # bobot 2^6 sudut hypercube dibangun per dimensi (urutan = itertools.product)
+        ws = [np.ones(len(X))]
+        for d in range(len(INPUTS)):
+            f = frac[:, d]
+            ws = [w * g for w in ws for g in (1.0 - f, f)]
+        out = np.zeros((len(X), len(OUTPUTS)))
+        for w, offset in zip(ws, self._corner_offsets):
+            out += w[:, None] * self.table[flat + offset]
+        return out
+
+    def lookup(self, x):
+        """Lookup LUT untuk satu titik (F, LM, RM, L, R, V), hasil sama dengan lookup_many"""
+        # jalur skalar murni Python: index ke memoryview table, tanpa alokasi NumPy
+        flat = self._flat
+        if self.interpolation == "nearest":
+            # dibuka per input (6 tetap); bisect di C lebih murah dari
+            # int(x * top + 0.5) dan sudah clamp sendiri
+            f, lm, rm, l, r, v = x
+            mid = self._midpoints
+            s0, s1, s2, s3, s4, s5 = self._flat_strides
+            k = (bisect_right(mid, f) * s0 + bisect_right(mid, lm) * s1 + bisect_right(mid, rm) * s2
+                 + bisect_right(mid, l) * s3 + bisect_right(mid, r) * s4 + bisect_right(mid, v) * s5)
+            return flat[k], flat[k + 1], flat[k + 2]
+
+        top = self.resolution - 1
+        pos = [min(max(float(u), 0.0), 1.0) * top for u in x]
+        base = [min(int(p), top - 1) for p in pos]
+        k0 = sum(b * st for b, st in zip(base, self._flat_strides))
+        # bobot 2^6 sudut, urutan sama dengan itertools.product di __init__
+        w = [1.0]
+        for p, b in zip(pos, base):
+            f = p - b
+            w = [wi * g for wi in w for g in (1.0 - f, f)]
+        steer = throttle = brake = 0.0
+        for wi, off in zip(w, self._flat_offsets):
+            k = k0 + off
+            steer += wi * flat[k]
+            throttle += wi * flat[k + 1]
+            brake += wi * flat[k + 2]
+        return steer, throttle, brake
@@ -0,0 +1,122 @@
+# line_controller.py
+"""
+Line Controller - mengikuti racing line yang dihitung offline (racing_line.py).
+1. Pure Pursuit: setir ke titik racing line sejauh lookahead (tumbuh dengan speed).
+2. Speed Profile: gas/rem mengikuti kecepatan target racing line di posisi mobil.
+3. Avoidance: cone/mobil di depan (dari sensor) menggeser titik target ke samping.
+
+Indeks titik terdekat diambil O(1) dari grid progress (progress.py): titik
+racing line ke-i sejajar stasiun centerline ke-i, jadi i = progress / spacing.
+Butuh pose mobil di dict sensor (x, y, heading).
+"""
+
+import math
+
+from utils import clamp
+from car import STEER_RATE
+
+
+class LineController:
+    def __init__(self, line, track_progress, track, max_speed: float = 900.0):
+        # data bersama per track (tidak ikut snapshot race)
+        self.line = line
+        self.track_progress = track_progress
+        self.track = track
+        self.max_speed = float(max_speed)
+
+        # ===== PURE PURSUIT =====
+        self.lookahead_base = 60.0   # px saat diam
+        self.lookahead_gain = 0.12   # px tambahan per px/s
+        self.min_steer_speed = 50.0  # speed minimum untuk hitung setir (mobil hampir diam)
+
+        # ===== OBSTACLE (CONE / MOBIL) =====
+        self.avoid_dist = 220.0
+        self.avoid_offset = 60.0     # geser samping titik target saat risk = 1 (px)
+        self.avoid_width = 30.0      # offset samping maks. obstacle yang dihindari (px)
+        self.avoid_slowdown = 0.5    # speed target turun sampai 50% saat risk = 1
+        self._avoid_dir = 0.0        # arah menghindar, dikunci selama obstacle terlihat
+
+    def _obstacle(self, s):
+        """(jarak, arah setir menghindar) obstacle terdekat di jalur mobil, atau None.
+        Ray yang berhenti di pixel jalan menabrak cone/mobil, bukan tepi jalan;
+        hit yang jauh ke samping (di luar avoid_width) tidak menghalangi."""
+        nearest = None
+        for key, deg in (("front", 0), ("lmid", -20), ("rmid", 20)):
+            d = s[key]
+            lateral = d * math.sin(math.radians(deg))
+            if d >= self.avoid_dist or abs(lateral) > self.avoid_width:
+                continue
+            if nearest is not None and d >= nearest[0]:
+                continue
+            a = s["heading"] + math.radians(deg)
+            if self.track.is_road(int(s["x"] + math.cos(a) * d), int(s["y"] + math.sin(a) * d)):
+                nearest = (d, lateral)
+        if nearest is None:
+            return None
+        d, lateral = nearest
+        if lateral == 0.0:
+            # obstacle tepat di depan: menghindar ke sisi yang lebih lega
+            space_left = (s["left"] + s["far_left"] + s["lmid"]) / 3.0
+            space_right = (s["right"] + s["far_right"] + s["rmid"]) / 3.0
+            return d, (-1.0 if space_left > space_right else 1.0)
+        return d, (-1.0 if lateral > 0 else 1.0)
+
+    def act(self, s):
+        """
+        Input: s (dict sensor + pose)
+        Output: steer, throttle, brake
+        """
+        x, y, heading = s["x"], s["y"], s["heading"]
+        speed = s["speed"]
+        line = self.line
+
+        # 1. TITIK TERDEKAT + TITIK LOOKAHEAD
+        i = int(self.track_progress.at(x, y) / line.spacing) % line.n
+        lookahead = self.lookahead_base + self.lookahead_gain * speed
+        tx, ty = line.points[(i + int(math.ceil(lookahead / line.spacing))) % line.n]
+
+        # 2. SPEED PROFILE (titik berikutnya, agar rem mulai tepat waktu)
+        target_speed = min(line.speed[(i + 1) % line.n], self.max_speed)
+
+        # 3. OBSTACLE AVOIDANCE: geser titik target ke samping, menjauhi obstacle
+        obstacle = self._obstacle(s)
+        if obstacle is None:
+            self._avoid_dir = 0.0
+        else:
+            dist, away = obstacle
+            if not self._avoid_dir:
+                self._avoid_dir = away
+            risk = clamp(1.0 - dist / self.avoid_dist, 0.0, 1.0)
+            shift = self._avoid_dir * self.avoid_offset * risk
+            # arah kanan mobil = heading + 90 derajat (setir positif)
+            tx -= math.sin(heading) * shift
+            ty += math.cos(heading) * shift
+            target_speed *= 1.0 - self.avoid_slowdown * risk
+
+        # 4. PURE PURSUIT: kelengkungan busur ke titik target -> yaw rate -> setir
+        dx, dy = tx - x, ty - y
+        dist = max(math.hypot(dx, dy), 1.0)
+        alpha = (math.atan2(dy, dx) - heading + math.pi) % (2 * math.pi) - math.pi
+        kappa = 2.0 * math.sin(alpha) / dist
+        steer = kappa * max(speed, self.min_steer_speed) / STEER_RATE
+        # target di belakang mobil (habis nabrak / putar balik): belok penuh
+        if abs(alpha) > math.pi / 2:
+            steer = math.copysign(1.0, alpha)
+        steer = clamp(steer, -1.0, 1.0)
+
+        # 5. ACTUATION
+        throttle = 0.0
+        brake = 0.0
+        if speed < target_speed:
+            throttle = clamp((target_speed - speed) / 30.0, 0.0, 1.0)
+        elif speed - target_speed > 10.0:
+            brake = clamp((speed - target_speed) / 60.0, 0.0, 1.0)
+
+        # Recovery stuck (mepet tembok / obstacle)
+        min_front = min(s["front"], s["lmid"], s["rmid"])
+        if speed < 10 and min_front < 40:
+            throttle = 1.0
+            brake = 0.0
+            steer = -1.0 if s["left"] > s["right"] else 1.0
+
+        return steer, throttle, brake
@@ -0,0 +1,199 @@
+# make_track_corpus.py
+"""Generator corpus track acak untuk benchmark generalisasi controller.
+
+Setiap track dibangun dari centerline spline tertutup (periodic cubic) lewat
+titik kontrol acak di sekitar elips, dengan lebar jalan yang bervariasi
+sepanjang lintasan. Hasilnya langsung di-rasterisasi dengan NumPy (tanpa
+window pygame) menjadi:
+
+    <out>/track_0000.png   gambar track (warna sama dengan make_nascar_track)
+    <out>/track_0000.json  layout: garis start, posisi start, centerline
+
+lalu dikompilasi ke cache Track (road mask + distance field). Track.layout
+membaca file .json di samping gambar, sehingga Race/simulate/tournament
+otomatis memakai garis dan posisi start milik track tersebut.
+
+Contoh:
+    python make_track_corpus.py --count 200 --workers 8
+    python tournament.py --corpus track_corpus --races 400
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pygame
+from scipy import interpolate, ndimage
+
+from track import Track
+
+OUT_DIR = "track_corpus"
+WIDTH, HEIGHT = 1000, 600
+
+# Warna sama dengan make_nascar_track.py (dikenali Track._classify_pixels)
+GRASS = (20, 80, 20)
+ROAD = (120, 120, 120)
+BLUE_LINE = (40, 80, 220)
+
+MAX_ATTEMPTS = 50
+
+
+def _centerline(rng, width, height, margin):
+    """Centerline tertutup: titik kontrol acak (polar) + spline periodic"""
+    k = int(rng.integers(8, 15))
+    base = np.linspace(0.0, 2 * math.pi, k, endpoint=False)
+    theta = base + rng.uniform(-0.3, 0.3, k) * (2 * math.pi / k)
+    radius = rng.uniform(0.5, 1.0, k)
+    cx, cy = width / 2, height / 2
+    ax, ay = width / 2 - margin, height / 2 - margin
+    px = cx + radius * ax * np.cos(theta)
+    py = cy + radius * ay * np.sin(theta)
+
+    # titik pertama diulang di akhir agar spline periodic tertutup
+    tck, _ = interpolate.splprep([np.append(px, px[0]), np.append(py, py[0])], s=0, per=True)
+    coarse = np.array(interpolate.splev(np.linspace(0, 1, 400), tck))
+    length = np.hypot(*np.diff(coarse, axis=1)).sum()
+
+    # sampling rapat (< 0.5 px) agar centerline tanpa celah saat dirasterisasi
+    u = np.linspace(0, 1, int(length * 2), endpoint=False)
+    x, y = interpolate.splev(u, tck)
+    dx, dy = interpolate.splev(u, tck, der=1)
+    ddx, ddy = interpolate.splev(u, tck, der=2)
+    speed = np.hypot(dx, dy)
+    curvature = (dx * ddy - dy * ddx) / speed ** 3
+    return np.stack([x, y], axis=1), np.stack([dx, dy], axis=1) / speed[:, None], curvature, length
+
+
+def _half_width(rng, n):
+    """Setengah lebar jalan per sampel: dasar acak + gelombang sinus sepanjang lap"""
+    base = rng.uniform(26.0, 42.0)
+    amp = rng.uniform(0.0, 0.3)
+    freq = int(rng.integers(1, 4))
+    phase = rng.uniform(0, 2 * math.pi)
+    s = np.linspace(0, 2 * math.pi, n, endpoint=False)
+    return base * (1.0 + amp * np.sin(freq * s + phase))
+
+
+def _rasterize(points, half_width, width, height):
+    """Mask jalan dan garis biru: jarak ke centerline <= setengah lebar lokal"""
+    ix = np.clip(np.rint(points[:, 0]).astype(np.intp), 0, width - 1)
+    iy = np.clip(np.rint(points[:, 1]).astype(np.intp), 0, height - 1)
+    line = np.zeros((height, width), dtype=bool)
+    line[iy, ix] = True
+    hw = np.zeros((height, width), dtype=np.float32)
+    hw[iy, ix] = half_width
+
+    dist, (ny, nx) = ndimage.distance_transform_edt(~line, return_indices=True)
+    road = dist <= hw[ny, nx]
+    blue = dist <= 1.5
+    return road, blue
+
+
+def _valid(road, half_width, curvature):
+    """Track valid: tikungan tidak lebih tajam dari lebar jalan, jalan satu
+    cincin (rumput luar + satu pulau dalam), dan tidak menyentuh tepi gambar"""
+    if np.any(np.abs(curvature) * half_width * 1.25 >= 1.0):
+        return False
+    if road[:4].any() or road[-4:].any() or road[:, :4].any() or road[:, -4:].any():
+        return False
+    _, n_road = ndimage.label(road)
+    _, n_grass = ndimage.label(~road)
+    return n_road == 1 and n_grass == 2
+
+
+def generate_layout(seed, width=WIDTH, height=HEIGHT):
+    """
+    Bangun satu track acak (deterministik per seed).
+
+    Returns:
+        (rgb, layout): gambar (height, width, 3) uint8 dan dict layout
+        dengan start_line ((x0, y0), (x1, y1)), start_poses [(x, y, heading)]
+        untuk 2 mobil, half_width, length, dan centerline (tiap ~8 px).
+    """
+    rng = np.random.default_rng(seed)
+    for _ in range(MAX_ATTEMPTS):
+        points, tangent, curvature, length = _centerline(rng, width, height, margin=70)
+        half_width = _half_width(rng, len(points))
+        road, blue = _rasterize(points, half_width, width, height)
+        if _valid(road, half_width, curvature):
+            break
+    else:
+        raise RuntimeError(f"Gagal membuat track valid untuk seed {seed}")
+
+    # arah balap acak (searah / berlawanan arah parameter spline)
+    if rng.random() < 0.5:
+        points, half_width, curvature = points[::-1], half_width[::-1], -curvature[::-1]
+        tangent = -tangent[::-1]
+
+    # garis start di bagian paling lurus (kelengkungan rata-rata ~60 px terkecil)
+    win = max(1, int(len(points) * 60 / length))
+    smooth = ndimage.uniform_filter1d(np.abs(curvature), win, mode="wrap")
+    i = int(np.argmin(smooth))
+    (px, py), (tx, ty), hw = points[i], tangent[i], float(half_width[i])
+    # segmen a->b tegak lurus arah balap; sisi positif (lihat race.crossed_start_line) = depan
+    nx, ny = -ty, tx
+    reach = hw + 6
+    start_line = [[px - nx * reach, py - ny * reach], [px + nx * reach, py + ny * reach]]
+
+    # dua mobil 30 px di depan garis, lajur kiri/kanan (seperti START_POSES)
+    heading = math.atan2(ty, tx)
+    lane = min(15.0, hw * 0.45)
+    fx, fy = px + tx * 30, py + ty * 30
+    start_poses = [[fx - nx * lane, fy - ny * lane, heading], [fx + nx * lane, fy + ny * lane, heading]]
+
+    rgb = np.empty((height, width, 3), dtype=np.uint8)
+    rgb[:] = GRASS
+    rgb[road] = ROAD
+    rgb[blue] = BLUE_LINE
+
+    step = max(1, int(len(points) * 8 / length))
+    layout = {
+        "seed": int(seed),
+        "size": [width, height],
+        "length": round(float(length), 1),
+        "half_width": [round(float(half_width.min()), 1), round(float(half_width.max()), 1)],
+        "start_line": [[round(float(v), 2) for v in p] for p in start_line],
+        "start_poses": [[round(float(v), 4) for v in p] for p in start_poses],
+        "centerline": np.round(points[::step], 1).tolist(),
+    }
+    return rgb, layout
+
+
+def build_track(job):
+    """Worker: generate, simpan png + json, lalu kompilasi ke cache Track"""
+    seed, out_dir, width, height = job
+    rgb, layout = generate_layout(seed, width, height)
+    stem = os.path.join(out_dir, f"track_{seed:04d}")
+    # surfarray berbentuk (width, height, 3); tidak perlu display untuk save
+    pygame.image.save(pygame.surfarray.make_surface(rgb.transpose(1, 0, 2)), stem + ".png")
+    with open(stem + ".json", "w") as f:
+        json.dump(layout, f)
+    Track(stem + ".png")
+    return stem + ".png"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate corpus track acak (headless, multi-proses)")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0, help="seed track pertama (track ke-i pakai seed+i)")
+    parser.add_argument("--out", default=OUT_DIR)
+    parser.add_argument("--width", type=int, default=WIDTH)
+    parser.add_argument("--height", type=int, default=HEIGHT)
+    parser.add_argument("--workers", type=int, default=None, help="default: jumlah core")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    jobs = [(args.seed + i, args.out, args.width, args.height) for i in range(args.count)]
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        paths = list(pool.map(build_track, jobs, chunksize=4))
+    elapsed = time.perf_counter() - t0
+    print(f"{len(paths)} track di {args.out} dalam {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,9 +20,12 @@ class Metrics:
         self.coll = 0  # jumlah collision
         self.corr = 0  # jumlah koreksi steering besar
         self.last_steer = 0.0
-        self.font = pygame.font.SysFont(None, 22)
+        self.font = None  # dibuat saat draw pertama, agar bisa dipakai headless
         self.finished = False
         self.finish_time = 0.0
+        # waktu saat melewati tiap batas sektor / checkpoint progress (diisi Race)
+        self.splits = []
+        self.checkpoints = []
 
     def update(self, dt, collided, steer):
         """
@@ -50,6 +53,8 @@ class Metrics:
             screen: pygame screen
             pos (tuple): posisi (x, y) untuk render
         """
+        if self.font is None:
+            self.font = pygame.font.SysFont(None, 22)
         txt = f"{self.label}: t={self.t:5.1f}s  collisions={self.coll}  corrections={self.corr}"
         img = self.font.render(txt, True, (255, 255, 255))
         screen.blit(img, pos)
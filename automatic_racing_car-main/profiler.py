@@ -0,0 +1,128 @@
+# profiler.py
+"""Timer per fase frame (sensor, kontrol, fisika, tabrakan, render, flip).
+
+Pemakaian:
+    timer = PhaseTimer()
+    timer.enabled = True
+    with timer("sensors:RED"):
+        ...
+    timer.end_frame()
+
+Durasi fase yang sama dalam satu frame dijumlahkan, lalu end_frame memasukkan
+total per frame ke jendela bergulir (window frame terakhir) untuk mean, p95,
+dan max. Saat enabled False, timer(name) mengembalikan context manager kosong
+yang sama, sehingga overhead hanya satu pemanggilan fungsi per fase.
+"""
+
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import pygame
+
+_NULL_SCOPE = nullcontext()
+
+
+class _Scope:
+    """Context manager per nama fase (dipakai ulang, tanpa alokasi per frame)"""
+
+    __slots__ = ("acc", "name", "t0")
+
+    def __init__(self, acc, name):
+        self.acc = acc
+        self.name = name
+        self.t0 = 0.0
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.acc[self.name] = self.acc.get(self.name, 0.0) + time.perf_counter() - self.t0
+
+
+class PhaseTimer:
+    """Kumpulan timer fase dengan statistik bergulir per frame"""
+
+    def __init__(self, window=120, enabled=False, refresh=15):
+        self.window = window
+        self.enabled = enabled
+        self.refresh = refresh  # HUD di-render ulang tiap `refresh` frame
+        self.history = {}  # nama fase -> deque durasi per frame (detik)
+        self._acc = {}
+        self._scopes = {}
+        self._frames = 0
+        self._font = None
+        self._panel = None
+
+    def __call__(self, name):
+        if not self.enabled:
+            return _NULL_SCOPE
+        scope = self._scopes.get(name)
+        if scope is None:
+            scope = self._scopes[name] = _Scope(self._acc, name)
+        return scope
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self._acc.clear()
+        self._panel = None
+
+    def end_frame(self):
+        """Masukkan total durasi tiap fase di frame ini ke jendela bergulir"""
+        if not self.enabled:
+            return
+        for name, dt in self._acc.items():
+            hist = self.history.get(name)
+            if hist is None:
+                hist = self.history[name] = deque(maxlen=self.window)
+            hist.append(dt)
+        self._acc.clear()
+        self._frames += 1
+
+    def stats(self):
+        """dict nama -> {"mean", "p95", "max"} dalam milidetik, plus jumlah sampel "n" """
+        out = {}
+        for name, hist in self.history.items():
+            if not hist:
+                continue
+            ordered = sorted(hist)
+            n = len(ordered)
+            out[name] = {
+                "mean": sum(ordered) / n * 1000,
+                "p95": ordered[min(n - 1, int(0.95 * n))] * 1000,
+                "max": ordered[-1] * 1000,
+                "n": n,
+            }
+        return out
+
+    def dump(self, path):
+        """Simpan statistik terakhir ke file JSON"""
+        with open(path, "w") as f:
+            json.dump({"window": self.window, "frames": self._frames, "phases_ms": self.stats()}, f, indent=2)
+
+    def draw(self, screen, topright):
+        """Render panel HUD (mean/p95/max per fase) dengan pojok kanan atas di
+        topright, kembalikan rect yang digambar"""
+        if not self.enabled:
+            return None
+        if self._panel is None or self._frames % self.refresh == 0:
+            self._panel = self._render_panel()
+        return screen.blit(self._panel, self._panel.get_rect(topright=topright))
+
+    def _render_panel(self):
+        if self._font is None:
+            self._font = pygame.font.SysFont("monospace", 13)
+        lines = [f"{'phase':16s} {'mean':>6s} {'p95':>6s} {'max':>6s} ms"]
+        for name, s in self.stats().items():
+            lines.append(f"{name:16s} {s['mean']:6.2f} {s['p95']:6.2f} {s['max']:6.2f}")
+        rows = [self._font.render(line, True, (230, 230, 230)) for line in lines]
+        width = max(r.get_width() for r in rows) + 12
+        height = sum(r.get_height() for r in rows) + 8
+        panel = pygame.Surface((width, height))
+        panel.fill((15, 15, 15))
+        y = 4
+        for r in rows:
+            panel.blit(r, (6, y))
+            y += r.get_height()
+        return panel
@@ -0,0 +1,227 @@
+# progress.py
+"""Indeks progress track: centerline + grid arc-length.
+
+Centerline diambil dari layout track (corpus, lihat make_track_corpus.py)
+atau ditelusuri dari road mask sebagai kontur "sama jauh dari rumput dalam
+dan rumput luar" (lihat balance_field), mulai dan berakhir di garis start.
+Titik 0 = perpotongan centerline dengan garis start, arah = sisi positif
+garis start (lihat race.crossed_start_line).
+
+Centerline di-rasterisasi rapat lalu distance transform (dengan indices)
+memberi setiap pixel titik centerline terdekat, sehingga `grid[y, x]` =
+progress (px sepanjang centerline, 0..length) dan lookup posisi apa pun O(1).
+Race memakai ini untuk lap, sektor, urutan posisi, dan gap.
+"""
+
+import math
+
+import numpy as np
+from scipy import ndimage
+
+STEP = 4.0  # langkah penelusuran centerline (px)
+MIN_LAP = 400.0  # panjang minimum centerline sebelum boleh menutup (px)
+
+# TrackProgress per (track, garis start, titik start), dibangun sekali per proses
+_cache = {}
+
+
+def _side(line, x, y):
+    """Posisi (x, y) relatif garis start: > 0 di sisi positif"""
+    ax, ay, bx, by = line
+    return (by - ay) * (x - ax) - (bx - ax) * (y - ay)
+
+
+def _crossing(line, p0, p1):
+    """Titik potong segmen p0-p1 dengan garis start (asumsi sisi berbeda)"""
+    s0, s1 = _side(line, *p0), _side(line, *p1)
+    t = s0 / (s0 - s1)
+    return (p0[0] + (p1[0] - p0[0]) * t, p0[1] + (p1[1] - p0[1]) * t)
+
+
+def _on_segment(line, x, y):
+    """True jika proyeksi (x, y) jatuh di dalam segmen garis start"""
+    ax, ay, bx, by = line
+    dx, dy = bx - ax, by - ay
+    t = ((x - ax) * dx + (y - ay) * dy) / (dx * dx + dy * dy)
+    return 0.0 <= t <= 1.0
+
+
+def _road_runs(track, line):
+    """Titik tengah tiap potongan jalan kontinu di sepanjang garis start"""
+    ax, ay, bx, by = line
+    n = int(math.hypot(bx - ax, by - ay)) + 1
+    t = np.linspace(0.0, 1.0, n)
+    xs, ys = ax + (bx - ax) * t, ay + (by - ay) * t
+    road = track.is_road_many(xs, ys).astype(np.int8)
+    edges = np.diff(np.concatenate([[0], road, [0]]))
+    starts, ends = np.nonzero(edges == 1)[0], np.nonzero(edges == -1)[0]
+    return [((xs[a] + xs[b - 1]) / 2, (ys[a] + ys[b - 1]) / 2) for a, b in zip(starts, ends)]
+
+
+def balance_field(track):
+    """
+    f = jarak ke rumput dalam - jarak ke rumput luar (px). Rumput luar =
+    komponen yang menyentuh tepi gambar, rumput dalam = sisanya (lubang di
+    tengah lintasan). Centerline = kontur f = 0.
+    """
+    grass = ~np.asarray(track.road_mask)
+    labels, _ = ndimage.label(grass)
+    border = np.unique(np.concatenate([labels[0], labels[-1], labels[:, 0], labels[:, -1]]))
+    outer = np.isin(labels, border[border > 0])
+    inner = grass & ~outer
+    if not inner.any():
+        raise ValueError("Track tidak punya rumput di dalam lintasan (bukan loop)")
+    f = ndimage.distance_transform_edt(~inner) - ndimage.distance_transform_edt(~outer)
+    return f.astype(np.float32)
+
+
+def _sample(field, x, y):
+    """Nilai field (h, w) di (x, y) dengan interpolasi bilinear"""
+    h, w = field.shape
+    x = min(max(x, 0.0), w - 1.001)
+    y = min(max(y, 0.0), h - 1.001)
+    ix, iy = int(x), int(y)
+    fx, fy = x - ix, y - iy
+    top = field[iy, ix] * (1 - fx) + field[iy, ix + 1] * fx
+    bottom = field[iy + 1, ix] * (1 - fx) + field[iy + 1, ix + 1] * fx
+    return float(top * (1 - fy) + bottom * fy)
+
+
+def trace_centerline(track, line, start_point):
+    """
+    Telusuri kontur f = 0 dari balance_field, mulai di potongan jalan pada
+    garis start yang paling dekat start_point: maju STEP px sepanjang tangen,
+    lalu koreksi Newton kembali ke f = 0, sampai memotong garis start lagi.
+    """
+    runs = _road_runs(track, line)
+    if not runs:
+        raise ValueError("Garis start tidak memotong jalan")
+    sx, sy = start_point
+    x, y = min(runs, key=lambda r: (r[0] - sx) ** 2 + (r[1] - sy) ** 2)
+
+    f = balance_field(track)
+    gy, gx = np.gradient(f)
+
+    def project(x, y):
+        for _ in range(3):
+            v, ux, uy = _sample(f, x, y), _sample(gx, x, y), _sample(gy, x, y)
+            g2 = ux * ux + uy * uy
+            if g2 < 1e-9:
+                break
+            x, y = x - v * ux / g2, y - v * uy / g2
+        return x, y
+
+    ax, ay, bx, by = line
+    dx, dy = by - ay, -(bx - ax)  # normal ke sisi positif = arah balapan
+    p = project(x, y)
+    points = [p]
+    travelled = 0.0
+    max_iter = int(4 * (track.width + track.height) * math.pi / STEP)
+    for _ in range(max_iter):
+        # tangen kontur = gradien diputar 90 derajat, searah gerak sebelumnya
+        tx, ty = -_sample(gy, *p), _sample(gx, *p)
+        if tx * dx + ty * dy < 0:
+            tx, ty = -tx, -ty
+        norm = math.hypot(tx, ty) or 1.0
+        dx, dy = tx / norm, ty / norm
+        q = project(p[0] + dx * STEP, p[1] + dy * STEP)
+        travelled += math.hypot(q[0] - p[0], q[1] - p[1])
+        if (travelled > MIN_LAP and _side(line, *p) < 0 <= _side(line, *q)
+                and _on_segment(line, *_crossing(line, p, q))):
+            return np.array(points)
+        points.append(q)
+        p = q
+    raise ValueError("Centerline tidak kembali ke garis start")
+
+
+def _orient(points, line):
+    """Putar (dan balik jika perlu) polyline tertutup agar mulai di garis start searah sisi positif"""
+    n = len(points)
+    for pts in (points, points[::-1]):
+        for i in range(n):
+            p0, p1 = pts[i], pts[(i + 1) % n]
+            if _side(line, *p0) < 0 <= _side(line, *p1) and _on_segment(line, *_crossing(line, p0, p1)):
+                return np.concatenate([pts[i + 1:], pts[:i + 1]])
+    raise ValueError("Centerline layout tidak memotong garis start")
+
+
+def _densify(points, spacing=1.0):
+    """Sampel polyline tertutup tiap <= spacing px; kembalikan (titik, arc-length)"""
+    closed = np.vstack([points, points[:1]])
+    seg = np.hypot(*np.diff(closed, axis=0).T)
+    out = []
+    for a, b, l in zip(closed[:-1], closed[1:], seg):
+        k = max(1, int(math.ceil(l / spacing)))
+        t = np.arange(k)[:, None] / k
+        out.append(a + (b - a) * t)
+    dense = np.vstack(out)
+    s = np.concatenate([[0.0], np.cumsum(np.hypot(*np.diff(dense, axis=0).T))])
+    return dense, s, float(seg.sum())
+
+
+class TrackProgress:
+    """Centerline + grid progress (px) untuk satu track dan garis start"""
+
+    def __init__(self, track, line, start_point):
+        self.line = tuple(line)
+        if track.layout and track.layout.get("centerline"):
+            points = np.asarray(track.layout["centerline"], dtype=np.float64)
+        else:
+            points = trace_centerline(track, line, start_point)
+        # mulai tepat di garis start
+        points = _orient(points, self.line)
+        origin = _crossing(self.line, points[-1], points[0])
+        self.centerline = np.vstack([origin, points])
+
+        dense, s, self.length = _densify(self.centerline)
+        h, w = track.height, track.width
+        ix = np.clip(np.rint(dense[:, 0]).astype(np.intp), 0, w - 1)
+        iy = np.clip(np.rint(dense[:, 1]).astype(np.intp), 0, h - 1)
+        # sampel terakhir per pixel yang menang; titik 0 ditulis paling akhir
+        sample = np.full((h, w), -1, dtype=np.int64)
+        sample[iy[::-1], ix[::-1]] = np.arange(len(dense))[::-1]
+        _, (ny, nx) = ndimage.distance_transform_edt(sample < 0, return_indices=True)
+        self.grid = s[sample[ny, nx]].astype(np.float32)
+        self.width, self.height = w, h
+
+    def at(self, x, y):
+        """Progress (px, 0..length) posisi (x, y), O(1)"""
+        ix = min(max(int(x), 0), self.width - 1)
+        iy = min(max(int(y), 0), self.height - 1)
+        return float(self.grid[iy, ix])
+
+    def at_many(self, xs, ys):
+        """Versi vectorized dari at"""
+        ix = np.clip(np.asarray(xs).astype(np.intp), 0, self.width - 1)
+        iy = np.clip(np.asarray(ys).astype(np.intp), 0, self.height - 1)
+        return self.grid[iy, ix].astype(np.float64)
+
+    def start(self, x, y):
+        """Progress awal (unwrapped) untuk posisi start: di belakang garis = negatif"""
+        s = self.at(x, y)
+        return s - self.length if s > self.length / 2 else s
+
+    def advance(self, progress, x, y):
+        """Progress unwrapped baru setelah mobil pindah ke (x, y)
+
+        Selisih diambil modulo panjang lap ke [-length/2, length/2), sehingga
+        melewati garis start menambah progress secara kontinu dan mundur
+        menguranginya."""
+        half = self.length / 2
+        delta = (self.at(x, y) - progress + half) % self.length - half
+        return progress + delta
+
+    def advance_many(self, progress, xs, ys):
+        """Versi vectorized dari advance"""
+        half = self.length / 2
+        delta = np.mod(self.at_many(xs, ys) - progress + half, self.length) - half
+        return progress + delta
+
+
+def progress_for(track, line, start_point):
+    """TrackProgress untuk track + garis start, dibangun sekali per proses"""
+    key = (track.img_path, tuple(line), tuple(round(v) for v in start_point))
+    prog = _cache.get(key)
+    if prog is None:
+        prog = _cache[key] = TrackProgress(track, line, start_point)
+    return prog
@@ -0,0 +1,441 @@
+# race.py
+"""Logika satu race RED (Rule) vs BLUE (Fuzzy) tanpa rendering.
+
+Dipakai bersama oleh mode visual (racing_two_cars.py) dan mode headless
+(simulate.py), sehingga keduanya menjalankan fisika, tabrakan, dan hitungan
+lap yang sama persis.
+"""
+
+from car import Car
+from rule_controller import RuleController, load_params
+from fuzzy_controller import FuzzyController
+from fuzzy_engine import FuzzyEngine
+from line_controller import LineController
+from racing_line import RacingLine
+from metrics import Metrics
+from profiler import PhaseTimer
+from progress import progress_for
+
+
+# ================== KONSTANTA ==================
+SENSOR_LEN = 320
+
+START_LINE_X = 490
+FINISH_LAPS = 5
+SECTORS = 3  # sektor per lap untuk split time
+CHECKPOINT_PX = 20  # jarak antar checkpoint progress untuk hitung gap (px)
+
+MAX_SPEED = 900
+
+CONE_COUNT = 10
+CONE_RADIUS = 8  # Diperkecil dari 10 agar tidak terlalu sering crash
+CONE_KEEPOUT = 40  # Diperkecil dari 60 agar deteksi tabrakan lebih akurat
+CONE_SPACING = 3 * CONE_RADIUS  # jarak minimum antar cone (Poisson-disk) agar cone tidak tumpang tindih
+
+# Posisi start (x, y, heading) RED lalu BLUE, menghadap kanan
+START_POSES = [(520, 110, 0.0), (520, 140, 0.0)]
+
+CAR_STYLES = [
+    # (warna body, label, warna sensor)
+    ((220, 40, 40), "RED (Rule)", (255, 80, 80)),
+    ((40, 130, 235), "BLUE (Fuzzy)", (80, 180, 255)),
+]
+
+
+# frekuensi fisika default (langkah tetap 1/60 detik, sama dengan viewer 60 FPS)
+PHYSICS_HZ = 60
+
+CONTROLLER_KINDS = ("rule", "fuzzy", "fuzzy_lut", "line")
+
+# LUT fuzzy di-load sekali per proses dan dipakai bersama semua controller.
+# nearest: lookup skalar ~1 us (linear ~40 us, 2^6 sudut), hasil race setara
+FUZZY_LUT_INTERPOLATION = "nearest"
+_fuzzy_engine = None
+
+
+def make_controller(kind, track=None, track_progress=None):
+    """
+    Buat controller dari nama (lihat CONTROLLER_KINDS); "rule:<file.json>"
+    membuat RuleController dengan parameter hasil tune.py. "line" butuh track
+    dan track_progress (racing line di-cache per track). Object controller
+    dikembalikan apa adanya.
+    """
+    global _fuzzy_engine
+    if kind == "rule":
+        return RuleController(MAX_SPEED)
+    if isinstance(kind, str) and kind.startswith("rule:"):
+        return RuleController(MAX_SPEED, params=load_params(kind[len("rule:"):]))
+    if kind == "fuzzy":
+        return FuzzyController(SENSOR_LEN, MAX_SPEED)
+    if kind == "fuzzy_lut":
+        if _fuzzy_engine is None:
+            _fuzzy_engine = FuzzyEngine.from_file(interpolation=FUZZY_LUT_INTERPOLATION)
+        return FuzzyController(SENSOR_LEN, MAX_SPEED, engine=_fuzzy_engine)
+    if kind == "line":
+        if track is None or track_progress is None:
+            raise ValueError("Controller line butuh track dan track_progress")
+        line = RacingLine.for_track(track, track_progress, MAX_SPEED)
+        return LineController(line, track_progress, track, MAX_SPEED)
+    if isinstance(kind, str):
+        raise ValueError(f"Controller tidak dikenal: {kind}")
+    return kind
+
+
+def with_rule_params(kinds, params_path):
+    """Ganti "rule" di daftar nama controller dengan "rule:<params_path>" (jika diisi)"""
+    if not params_path:
+        return tuple(kinds)
+    return tuple(f"rule:{params_path}" if k == "rule" else k for k in kinds)
+
+
+def default_start_poses(track):
+    """Posisi start dari layout track (corpus), atau START_POSES"""
+    if track.layout:
+        return [tuple(p) for p in track.layout["start_poses"]]
+    return list(START_POSES)
+
+
+def default_start_line(track):
+    """Garis start (x0, y0, x1, y1) dari layout track, atau garis vertikal x = START_LINE_X"""
+    if track.layout:
+        (x0, y0), (x1, y1) = track.layout["start_line"]
+        return (x0, y0, x1, y1)
+    return (START_LINE_X, 0, START_LINE_X, track.height)
+
+
+def crossed_start_line(line, x0, y0, x1, y1):
+    """
+    True jika gerak (x0,y0) -> (x1,y1) memotong segmen garis start dari sisi
+    negatif ke sisi positif. Sisi positif = arah a->b diputar 90 derajat
+    (untuk garis default: ke kanan). Bekerja juga untuk array NumPy.
+    """
+    ax, ay, bx, by = line
+    dx, dy = bx - ax, by - ay
+    s0 = dy * (x0 - ax) - dx * (y0 - ay)
+    s1 = dy * (x1 - ax) - dx * (y1 - ay)
+    # titik potong harus di dalam segmen (0 <= t <= 1); dikali s1 - s0 (> 0
+    # saat memotong) agar tanpa pembagian
+    d = s1 - s0
+    proj = d * ((x0 - ax) * dx + (y0 - ay) * dy) - s0 * ((x1 - x0) * dx + (y1 - y0) * dy)
+    return (s0 < 0) & (s1 >= 0) & (proj >= 0) & (proj <= d * (dx * dx + dy * dy))
+
+
+class FixedTimestep:
+    """
+    Accumulator fixed-timestep: waktu frame (variabel) dipecah menjadi
+    langkah fisika dengan dt tetap 1/hz, sehingga hasil simulasi tidak
+    bergantung frame rate viewer atau ukuran langkah headless.
+
+    steps(frame_dt) mengembalikan jumlah langkah fisika untuk frame ini;
+    alpha (0..1) = sisa waktu di accumulator, untuk interpolasi render.
+    max_steps membatasi langkah per frame (sisa waktu dibuang) agar viewer
+    yang lambat tidak makin tertinggal.
+    """
+
+    def __init__(self, hz=PHYSICS_HZ, max_steps=None):
+        self.hz = hz
+        self.dt = 1.0 / hz
+        self.max_steps = max_steps
+        self.acc = 0.0
+
+    def steps(self, frame_dt):
+        self.acc += frame_dt
+        # toleransi kecil agar frame_dt = k * dt tepat menghasilkan k langkah
+        n = int(self.acc / self.dt + 1e-9)
+        if self.max_steps is not None and n > self.max_steps:
+            n = self.max_steps
+            self.acc = n * self.dt
+        self.acc = max(self.acc - n * self.dt, 0.0)
+        return n
+
+    @property
+    def alpha(self):
+        return min(self.acc / self.dt, 1.0)
+
+
+# atribut controller yang dipakai bersama antar race (engine LUT, racing line)
+SHARED_CONTROLLER_ATTRS = ("engine", "line", "track_progress", "track")
+
+# atribut Car yang berubah selama race (untuk snapshot/restore), selain pos
+CAR_STATE = (
+    "heading", "vel", "lap_count", "last_x", "last_y", "progress",
+    "cone_hit_cooldown", "car_hit_cooldown", "finished",
+)
+
+
+class Race:
+    """Mobil + controller + metrics untuk satu race, di-update per langkah dt"""
+
+    def __init__(self, track, cones, controllers=("rule", "fuzzy"), laps=FINISH_LAPS, start_poses=None,
+                 start_line=None, timer=None, telemetry=None):
+        self.track = track
+        self.cones = cones
+        self.laps = laps
+        self.start_line = start_line or default_start_line(track)
+        start_poses = start_poses or default_start_poses(track)
+
+        self.cars = []
+        self.metrics = []
+        self.controller_kinds = tuple(controllers)
+        for (x, y, heading), (color, label, sensor_color), ctrl in zip(start_poses, CAR_STYLES, controllers):
+            car = Car((x, y), color, track, label, sensor_color, SENSOR_LEN)
+            car.heading = car.prev_heading = heading
+            car.max_speed = MAX_SPEED
+            self.cars.append(car)
+            self.metrics.append(Metrics(label))
+
+        # progress O(1) sepanjang centerline (lap, sektor, posisi, gap)
+        cx = sum(p[0] for p in start_poses[:len(self.cars)]) / len(self.cars)
+        cy = sum(p[1] for p in start_poses[:len(self.cars)]) / len(self.cars)
+        self.track_progress = progress_for(track, self.start_line, (cx, cy))
+        self.sync_progress()
+        self.controllers = [make_controller(c, track, self.track_progress) for c in controllers[:len(self.cars)]]
+
+        self.finished = False
+        self.steps = 0
+        # output controller langkah terakhir per mobil (dipakai replay)
+        self.last_controls = [(0.0, 0.0, 0.0)] * len(self.cars)
+        # TelemetryRecorder opsional, ditutup otomatis saat race selesai
+        self.telemetry = telemetry
+        # timer fase (nonaktif = hampir tanpa overhead), nama fase per mobil
+        self.timer = timer or PhaseTimer()
+        self._phases = []
+        for car in self.cars:
+            tag = car.name.split()[0]
+            self._phases.append((f"sensors:{tag}", f"act:{tag}", f"physics:{tag}", f"cones:{tag}"))
+
+    def step(self, dt):
+        """Satu langkah simulasi: sensor, kontrol, fisika, tabrakan, lap"""
+        # Cek jika kedua mobil sudah finish, hentikan semua update
+        if all(car.finished for car in self.cars) and not self.finished:
+            self.finished = True
+            self.close()
+
+        timer = self.timer
+        rec = self.telemetry if not self.finished else None
+        self.steps += 1
+        for i, (car, ctrl, met) in enumerate(zip(self.cars, self.controllers, self.metrics)):
+            if car.finished:
+                if rec is not None:
+                    rec.log_car(i, car)
+                continue
+            other = self.cars[1 - i]
+            ph_sensors, ph_act, ph_physics, ph_cones = self._phases[i]
+
+            with timer(ph_sensors):
+                s = car.read_sensors(cones=self.cones, other_car=other)
+                s["dt"] = dt
+            with timer(ph_act):
+                st, th, br = ctrl.act(s)
+            self.last_controls[i] = (st, th, br)
+            with timer(ph_physics):
+                car.update(dt, st, th, br)
+                hit_wall = car.collide_wall()
+
+            # Logika tabrakan cone dengan cooldown
+            hit_cone = False
+            with timer(ph_cones):
+                if car.cone_hit_cooldown <= 0:
+                    if self.cones.collide_car(car):
+                        hit_cone = True
+                        car.vel *= 0.4  # Hanya kurangi kecepatan
+                        car.cone_hit_cooldown = 1.0  # Cooldown 1 detik
+
+            met.update(dt, hit_wall or hit_cone, st)
+
+            # Cek finish lap: progress kumulatif melewati kelipatan panjang lap
+            self._update_progress(car, met)
+            car.last_x = car.pos.x
+            car.last_y = car.pos.y
+
+            if rec is not None:
+                rec.log_car(i, car, st, th, br, hit_wall, hit_cone)
+
+        # ---------- Tabrakan Antar Mobil ----------
+        car_rule, car_fuzzy = self.cars
+        with timer("car_collision"):
+            hit_cars = not self.finished and car_rule.collides_with_car(car_fuzzy)
+        if rec is not None:
+            rec.end_step(dt, hit_cars)
+        if hit_cars:
+            # Update metrics untuk kedua mobil
+            for met in self.metrics:
+                met.update(dt, True, 0)
+
+            # Beri efek pelan pada kedua mobil
+            car_rule.vel *= 0.3
+            car_fuzzy.vel *= 0.3
+
+    def _update_progress(self, car, met):
+        prog = self.track_progress
+        car.progress = prog.advance(car.progress, car.pos.x, car.pos.y)
+        # split sektor dan checkpoint hanya dicatat saat pertama dilewati
+        sectors = int(car.progress // (prog.length / SECTORS))
+        while len(met.splits) < sectors:
+            met.splits.append(met.t)
+        checkpoints = int(car.progress // CHECKPOINT_PX)
+        while len(met.checkpoints) < checkpoints:
+            met.checkpoints.append(met.t)
+        if car.progress >= (car.lap_count + 1) * prog.length:
+            car.lap_count += 1
+            if car.lap_count >= self.laps:
+                car.finished = True
+                met.finish_time = met.t  # Catat waktu finish
+
+    def sync_progress(self):
+        """Set ulang progress mobil dari posisinya (awal race, atau setelah
+        mobil dipindah di luar simulasi seperti placement mode)"""
+        prog = self.track_progress
+        for car in self.cars:
+            car.progress = car.lap_count * prog.length + prog.start(car.pos.x, car.pos.y)
+
+    def standings(self):
+        """
+        Urutan posisi sekarang: list (indeks mobil, gap detik ke pemimpin).
+        Mobil finish diurutkan menurut waktu finish, sisanya menurut progress.
+        Gap = selisih waktu melewati checkpoint terakhir yang sama.
+        """
+        def key(i):
+            car, met = self.cars[i], self.metrics[i]
+            return (0, met.finish_time) if car.finished else (1, -car.progress)
+
+        order = sorted(range(len(self.cars)), key=key)
+        leader = self.metrics[order[0]]
+        out = []
+        for i in order:
+            mine = self.metrics[i].checkpoints
+            k = min(len(mine), len(leader.checkpoints))
+            out.append((i, mine[k - 1] - leader.checkpoints[k - 1] if k else 0.0))
+        return out
+
+    def sector_times(self, i):
+        """Durasi tiap sektor di lap yang berisi split terakhir mobil ke-i"""
+        splits = self.metrics[i].splits
+        lap_start = max(0, (len(splits) - 1) // SECTORS) * SECTORS
+        prev = splits[lap_start - 1] if lap_start else 0.0
+        out = []
+        for t in splits[lap_start:lap_start + SECTORS]:
+            out.append(t - prev)
+            prev = t
+        return out
+
+    def snapshot(self):
+        """State dinamis race (mobil, controller, metrics) sebagai dict JSON-able"""
+        return {
+            "steps": self.steps,
+            "finished": self.finished,
+            "cars": [dict({k: getattr(car, k) for k in CAR_STATE}, x=car.pos.x, y=car.pos.y) for car in self.cars],
+            # state controller = semua atribut kecuali data yang dipakai bersama
+            "controllers": [{k: v for k, v in vars(c).items() if k not in SHARED_CONTROLLER_ATTRS}
+                            for c in self.controllers],
+            "metrics": [{k: v for k, v in vars(m).items() if k not in ("font", "label")} for m in self.metrics],
+        }
+
+    def restore(self, state):
+        """Kembalikan state dari snapshot(); track dan cone tidak ikut"""
+        self.steps = state["steps"]
+        self.finished = state["finished"]
+        for car, cs in zip(self.cars, state["cars"]):
+            car.pos.update(cs["x"], cs["y"])
+            for k in CAR_STATE:
+                setattr(car, k, cs[k])
+            car.prev_pos.update(car.pos)
+            car.prev_heading = car.heading
+        for ctrl, cs in zip(self.controllers, state["controllers"]):
+            vars(ctrl).update(cs)
+        for met, ms in zip(self.metrics, state["metrics"]):
+            vars(met).update(ms)
+
+    def close(self):
+        """Tutup telemetry (jika ada) untuk race yang dihentikan sebelum selesai"""
+        if self.telemetry is not None:
+            self.telemetry.close()
+
+    def record(self, race_number):
+        """Hasil race dalam format race_history"""
+        car_rule, car_fuzzy = self.cars
+        met_rule, met_fuzzy = self.metrics
+        return {
+            "race": race_number,
+            "red_time": met_rule.finish_time,
+            "red_laps": car_rule.lap_count,
+            "red_crashes": met_rule.coll,
+            "blue_time": met_fuzzy.finish_time,
+            "blue_laps": car_fuzzy.lap_count,
+            "blue_crashes": met_fuzzy.coll,
+            # progress dalam satuan lap (pecahan), untuk pemenang race yang tidak selesai
+            "red_progress": round(car_rule.progress / self.track_progress.length, 4),
+            "blue_progress": round(car_fuzzy.progress / self.track_progress.length, 4),
+        }
+
+
+def race_winner(race, laps=FINISH_LAPS):
+    """Tentukan pemenang satu record race: "RED", "BLUE", "DRAW", atau "NONE" """
+    if race["red_laps"] > race["blue_laps"]:
+        return "RED"
+    if race["blue_laps"] > race["red_laps"]:
+        return "BLUE"
+    if race["red_laps"] >= laps:
+        # Keduanya finish, bandingkan waktu
+        if race["red_time"] < race["blue_time"]:
+            return "RED"
+        if race["blue_time"] < race["red_time"]:
+            return "BLUE"
+        return "DRAW"
+    # Tidak ada yang finish: yang paling jauh di lintasan menang
+    if "red_progress" in race:
+        if race["red_progress"] > race["blue_progress"]:
+            return "RED"
+        if race["blue_progress"] > race["red_progress"]:
+            return "BLUE"
+        return "DRAW"
+    return "NONE"
+
+
+def print_evaluation(race_history, laps=FINISH_LAPS, rows=True):
+    """Cetak tabel evaluasi dan summary dari list record race (rows=False: summary saja)"""
+    print("\n" + "=" * 120)
+    print(" " * 45 + "RACE EVALUATION RESULTS")
+    print("=" * 120)
+
+    if not race_history:
+        print("No races completed.")
+        print("=" * 120)
+        return
+
+    if rows:
+        # Header tabel
+        header = "| Race | " + "RED Car (Rule-Based)" + " " * 10 + "| " + "BLUE Car (Fuzzy Logic)" + " " * 10 + "| Winner     |"
+        separator = "-" * 120
+        subheader = "|  No. | Time (s) | Laps | Crashes | Time (s) | Laps | Crashes | Winner     |"
+
+        print(header)
+        print(separator)
+        print(subheader)
+        print(separator)
+
+        # Data setiap race
+        for race in race_history:
+            winner = race_winner(race, laps)
+            row = f"|  {race['race']:2d}  | {race['red_time']:8.2f} | {race['red_laps']:4d} | {race['red_crashes']:7d} | {race['blue_time']:8.2f} | {race['blue_laps']:4d} | {race['blue_crashes']:7d} | {winner:10s} |"
+            print(row)
+
+        print(separator)
+
+    # Summary statistik
+    total_races = len(race_history)
+    winners = [race_winner(r, laps) for r in race_history]
+    red_wins = winners.count("RED")
+    blue_wins = winners.count("BLUE")
+
+    avg_red_time = sum(r["red_time"] for r in race_history) / total_races
+    avg_blue_time = sum(r["blue_time"] for r in race_history) / total_races
+    total_red_crashes = sum(r["red_crashes"] for r in race_history)
+    total_blue_crashes = sum(r["blue_crashes"] for r in race_history)
+
+    print("\nSUMMARY:")
+    print(f"  Total Races: {total_races}")
+    print(f"  RED Wins: {red_wins} | BLUE Wins: {blue_wins}")
+    print(f"  RED Avg Time: {avg_red_time:.2f}s | BLUE Avg Time: {avg_blue_time:.2f}s")
+    print(f"  RED Total Crashes: {total_red_crashes} | BLUE Total Crashes: {total_blue_crashes}")
+    print("=" * 120)
@@ -0,0 +1,153 @@
+# racing_line.py
+"""Racing line minimum-curvature + profil kecepatan, dihitung sekali per track.
+
+Centerline dari TrackProgress (lihat progress.py) di-resample tiap SPACING
+px. Titik racing line P_i = C_i + a_i * N_i (N = normal centerline), dengan
+offset a_i dibatasi lebar jalan (dist_field - MARGIN). Offset dicari dengan
+least squares berbatas (scipy lsq_linear) yang meminimalkan jumlah kuadrat
+selisih kedua P_{i-1} - 2 P_i + P_{i+1}, yaitu garis dengan kelengkungan
+total minimum.
+
+Profil kecepatan mengikuti batas fisika Car:
+    - tikungan: v <= CORNER_FACTOR * STEER_RATE / kelengkungan
+    - akselerasi maju: dv/dt = ACCEL - k v (k dari drag)
+    - pengereman mundur: dv/dt = -(BRAKE_ACCEL * BRAKE_FACTOR + k v)
+
+Hasil disimpan di folder cache track (racing_line-<hash>.npz) dan di memori
+per proses, sehingga banyak race memakai ulang hasil yang sama. Karena titik
+ke-i sejajar stasiun centerline ke-i, indeks titik terdekat untuk posisi
+mobil cukup progress.at(x, y) / spacing (O(1)).
+"""
+
+import hashlib
+import json
+import math
+import os
+import tempfile
+
+import numpy as np
+from scipy.optimize import lsq_linear
+
+from car import ACCEL, BRAKE_ACCEL, DRAG, DRAG_HZ, STEER_RATE
+
+SPACING = 8.0  # jarak antar stasiun (px)
+MARGIN = 18.0  # jarak minimum racing line ke tepi jalan (px)
+CORNER_FACTOR = 0.9  # cadangan terhadap batas steer di tikungan
+BRAKE_FACTOR = 0.8  # bagian BRAKE_ACCEL yang dipakai di profil kecepatan
+FORMAT = 1
+
+# RacingLine per (track, garis start, max_speed), dibangun sekali per proses
+_cache = {}
+
+
+def _resample(centerline, length):
+    """Resample polyline tertutup ke n titik berjarak sama (arc-length)"""
+    closed = np.vstack([centerline, centerline[:1]])
+    s = np.concatenate([[0.0], np.cumsum(np.hypot(*np.diff(closed, axis=0).T))])
+    n = max(8, int(round(length / SPACING)))
+    u = np.arange(n) * (s[-1] / n)
+    return np.stack([np.interp(u, s, closed[:, 0]), np.interp(u, s, closed[:, 1])], axis=1)
+
+
+def min_curvature_offsets(center, normal, bound):
+    """Offset a (n,) dengan |a_i| <= bound_i yang meminimalkan sum |P_{i-1} - 2 P_i + P_{i+1}|^2"""
+    n = len(center)
+    i = np.arange(n)
+    # baris 2i (komponen x) dan 2i+1 (komponen y) = selisih kedua di titik i
+    a_mat = np.zeros((2 * n, n))
+    for shift, w in ((-1, 1.0), (0, -2.0), (1, 1.0)):
+        j = (i + shift) % n
+        for axis in (0, 1):
+            a_mat[2 * i + axis, j] += w * normal[j, axis]
+    d2 = np.roll(center, 1, axis=0) - 2 * center + np.roll(center, -1, axis=0)
+    # n hanya ratusan titik: BVLS dense jauh lebih cepat konvergen dari TRF sparse
+    return lsq_linear(a_mat, -d2.reshape(-1), bounds=(-bound, bound), method="bvls").x
+
+
+def curvature(points):
+    """Kelengkungan Menger (1/px) di tiap titik polyline tertutup"""
+    a = np.roll(points, 1, axis=0)
+    c = np.roll(points, -1, axis=0)
+    ab = np.hypot(*(points - a).T)
+    bc = np.hypot(*(c - points).T)
+    ca = np.hypot(*(c - a).T)
+    cross = (points[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (points[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+    return 2.0 * np.abs(cross) / np.maximum(ab * bc * ca, 1e-9)
+
+
+def speed_profile(points, max_speed):
+    """Kecepatan target (px/s) per titik dari batas steer, akselerasi, dan rem"""
+    kappa = curvature(points)
+    limit = np.minimum(max_speed, CORNER_FACTOR * STEER_RATE / np.maximum(kappa, 1e-9))
+    ds = np.hypot(*(np.roll(points, -1, axis=0) - points).T)  # ds[i] = jarak i -> i+1
+    k = -math.log(DRAG) * DRAG_HZ  # laju drag kontinu (1/s)
+    brake = BRAKE_ACCEL * BRAKE_FACTOR
+    n = len(points)
+    v = limit.copy()
+    # dua putaran agar batas melintasi titik awal loop ikut terbawa
+    for _ in range(2):
+        for i in range(n):
+            j = (i + 1) % n
+            v[j] = min(v[j], math.sqrt(v[i] ** 2 + 2 * max(ACCEL - k * v[i], 0.0) * ds[i]))
+    for _ in range(2):
+        for i in range(n - 1, -1, -1):
+            j = (i + 1) % n
+            v[i] = min(v[i], math.sqrt(v[j] ** 2 + 2 * (brake + k * v[j]) * ds[i]))
+    return v
+
+
+class RacingLine:
+    """Titik racing line (n, 2) + kecepatan target (n,) per stasiun centerline"""
+
+    def __init__(self, points, speed, spacing):
+        self.points = points
+        self.speed = speed
+        self.spacing = spacing
+        self.n = len(points)
+
+    @classmethod
+    def build(cls, track, track_progress, max_speed):
+        """Hitung racing line dari centerline track_progress"""
+        center = _resample(track_progress.centerline, track_progress.length)
+        tangent = np.roll(center, -1, axis=0) - np.roll(center, 1, axis=0)
+        tangent /= np.maximum(np.hypot(*tangent.T), 1e-9)[:, None]
+        normal = np.stack([-tangent[:, 1], tangent[:, 0]], axis=1)
+
+        ix = np.clip(center[:, 0].astype(np.intp), 0, track.width - 1)
+        iy = np.clip(center[:, 1].astype(np.intp), 0, track.height - 1)
+        bound = np.maximum(np.asarray(track.dist_field)[iy, ix] - MARGIN, 1e-3)
+
+        points = center + min_curvature_offsets(center, normal, bound)[:, None] * normal
+        return cls(points, speed_profile(points, max_speed), track_progress.length / len(center))
+
+    @classmethod
+    def for_track(cls, track, track_progress, max_speed):
+        """RacingLine dari cache (memori, lalu folder cache track), dibangun jika belum ada"""
+        params = {
+            "line": [round(v, 3) for v in track_progress.line],
+            "length": round(track_progress.length, 3),
+            "max_speed": max_speed,
+            "physics": [ACCEL, BRAKE_ACCEL, DRAG, STEER_RATE],
+            "tuning": [SPACING, MARGIN, CORNER_FACTOR, BRAKE_FACTOR],
+            "format": FORMAT,
+        }
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+        key = (track.img_path, digest)
+        line = _cache.get(key)
+        if line is not None:
+            return line
+
+        path = os.path.join(track.cache_dir, f"racing_line-{digest}.npz") if track.cache_dir else None
+        if path and os.path.exists(path):
+            with np.load(path) as data:
+                line = cls(data["points"], data["speed"], float(data["spacing"]))
+        else:
+            line = cls.build(track, track_progress, max_speed)
+            if path:
+                # tulis ke file sementara lalu rename, aman untuk banyak proses
+                fd, tmp = tempfile.mkstemp(dir=track.cache_dir, suffix=".npz")
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(f, points=line.points, speed=line.speed, spacing=line.spacing)
+                os.replace(tmp, path)
+        _cache[key] = line
+        return line
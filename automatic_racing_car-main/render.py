@@ -0,0 +1,95 @@
+# render.py
+"""Render pipeline dengan background cache dan dirty-rect update.
+
+Track dan cone statis digambar sekali ke layer background (cone hanya pindah
+saat shuffle). Tiap frame hanya area di bawah mobil, ray debug, dan teks HUD
+yang dihapus (dari background) lalu digambar ulang, kemudian
+`pygame.display.update(rects)` hanya untuk area tersebut.
+"""
+
+import pygame
+
+
+class Renderer:
+    """Compositor frame: background cache + daftar dirty rect per frame"""
+
+    def __init__(self, screen, track, cones):
+        self.screen = screen
+        self.track = track
+        self.cones = cones
+        self.background = None
+        self._cones_version = None
+        self._prev_rects = []
+        self._rects = []
+        self._full_redraw = True
+
+    def _build_background(self):
+        """Gambar track + cone ke layer background (sekali per layout cone)"""
+        self.background = pygame.Surface(self.screen.get_size()).convert()
+        self.track.draw(self.background)
+        self.cones.draw(self.background)
+        self._cones_version = self.cones.version
+        self._full_redraw = True
+
+    def begin_frame(self):
+        """Hapus gambar frame sebelumnya dengan menyalin background di bawahnya"""
+        if self.background is None or self._cones_version != self.cones.version:
+            self._build_background()
+
+        if self._full_redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for r in self._prev_rects:
+                self.screen.blit(self.background, r, r)
+        self._rects = []
+
+    def mark(self, rects):
+        """Tandai rect (atau list rect) sebagai area yang digambar frame ini"""
+        if isinstance(rects, pygame.Rect):
+            self._rects.append(rects)
+        elif rects:
+            self._rects.extend(rects)
+
+    def blit(self, surface, dest):
+        """screen.blit yang sekaligus mencatat dirty rect"""
+        rect = self.screen.blit(surface, dest)
+        self._rects.append(rect)
+        return rect
+
+    def end_frame(self):
+        """Kirim ke display hanya area yang berubah (frame lalu + frame ini)"""
+        if self._full_redraw:
+            pygame.display.flip()
+            self._full_redraw = False
+        else:
+            pygame.display.update(self._prev_rects + self._rects)
+        self._prev_rects = self._rects
+
+
+# warna teks HUD per mobil (urutan Race.cars)
+HUD_COLORS = [(255, 100, 100), (100, 180, 255)]
+
+
+def draw_hud(renderer, font, cars, metrics, laps, sector_times, standings):
+    """Baris status per mobil (lap, waktu, crash, split sektor) + posisi live.
+
+    sector_times: list durasi sektor per mobil (Race.sector_times),
+    standings: list (indeks mobil, gap) seperti Race.standings().
+    Dipakai viewer lokal (racing_two_cars.py) dan viewer stream (stream.py).
+    """
+    y = 20
+    for car, met, sectors, color in zip(cars, metrics, sector_times, HUD_COLORS):
+        # waktu finish jika sudah selesai, jika tidak waktu berjalan
+        time_str = f"{met.finish_time:.1f}s" if car.finished else f"{met.t:.1f}s"
+        txt = (f"{car.name.split()[0]}: Lap {min(car.lap_count, laps)}/{laps} | Time: {time_str}"
+               f" | Crashes: {met.coll}")
+        txt += " | Sectors: " + " ".join(f"{t:.1f}" for t in sectors)
+        renderer.blit(font.render(txt, True, color), (20, y))
+        y += 24
+
+    # posisi live + gap ke pemimpin (dari progress centerline)
+    txt_pos = "   ".join(
+        f"P{k + 1} {cars[i].name.split()[0]}" + (f" +{gap:.2f}s" if k else "")
+        for k, (i, gap) in enumerate(standings)
+    )
+    renderer.blit(font.render(txt_pos, True, (255, 255, 255)), (20, y))
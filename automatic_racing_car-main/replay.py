@@ -0,0 +1,272 @@
+# replay.py
+"""Record/replay race deterministik.
+
+Recorder menyimpan semua yang menentukan jalannya race: track, posisi cone,
+controller, state awal, lalu per langkah dt dan output controller
+(steer, throttle, brake). Karena fisika dan controller deterministik,
+mengulang Race.step dengan dt yang sama dari state awal menghasilkan race
+yang identik bit per bit; output controller yang direkam dipakai untuk
+memverifikasi hal itu.
+
+Setiap KEYFRAME_EVERY langkah disimpan snapshot state lengkap
+(Race.snapshot), sehingga seek (misalnya ke awal lap 4) cukup restore
+keyframe terdekat lalu simulasi maju beberapa langkah saja. Perubahan state
+di luar simulasi (placement mode di game) direkam sebagai event snapshot.
+
+File replay (.npz): dt (steps,), controls (steps, mobil, 3), meta (JSON),
+keyframes (JSON), events (JSON).
+
+Contoh:
+    python simulate.py --races 20 --replay replays
+    python replay.py verify replays/race_0007.npz
+    python replay.py play replays/race_0007.npz --speed 8
+"""
+
+import argparse
+import bisect
+import json
+import os
+
+import numpy as np
+
+from track import Track
+from cones import ConeManager
+from race import Race, CONE_KEEPOUT
+
+KEYFRAME_EVERY = 300  # langkah (5 detik pada 60 Hz)
+SPEEDS = (1, 8, 64)
+
+
+class ReplayRecorder:
+    """Rekam satu race: panggil step(dt) sebagai ganti race.step(dt)"""
+
+    def __init__(self, race, keyframe_every=KEYFRAME_EVERY):
+        for kind in race.controller_kinds:
+            if not isinstance(kind, str):
+                raise ValueError("Replay hanya mendukung controller berdasarkan nama (lihat CONTROLLER_KINDS)")
+        self.race = race
+        self.keyframe_every = keyframe_every
+        self.meta = {
+            "track": os.path.abspath(race.track.img_path),
+            "laps": race.laps,
+            "controllers": list(race.controller_kinds),
+            "start_line": list(race.start_line),
+            "start_poses": [[car.pos.x, car.pos.y, car.heading] for car in race.cars],
+            "cones": [[c.pos.x, c.pos.y, c.radius] for c in race.cones.cones],
+        }
+        self.dts = []
+        self.controls = []
+        self.keyframes = []
+        self.events = []
+        self.lap_steps = [[] for _ in race.cars]
+        # True jika state race diubah di luar step (placement mode)
+        self.edited = True
+        self.saved = False
+
+    def step(self, dt):
+        race = self.race
+        if race.finished:
+            # setelah race selesai state tidak berubah lagi, tidak perlu direkam
+            race.step(dt)
+            return
+        i = len(self.dts)
+        if self.edited:
+            self.events.append([i, race.snapshot()])
+            self.edited = False
+        if i % self.keyframe_every == 0:
+            self.keyframes.append([i, race.snapshot()])
+
+        laps = [car.lap_count for car in race.cars]
+        race.step(dt)
+        self.dts.append(dt)
+        self.controls.append(list(race.last_controls))
+        for k, car in enumerate(race.cars):
+            if car.lap_count > laps[k]:
+                self.lap_steps[k].append(i + 1)
+
+    def save(self, path):
+        """Simpan replay ke path (.npz)"""
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        meta = dict(self.meta, steps=len(self.dts), lap_steps=self.lap_steps, record=self.race.record(0))
+        n_cars = len(self.race.cars)
+        np.savez_compressed(
+            path,
+            dt=np.asarray(self.dts, dtype=np.float64),
+            controls=np.asarray(self.controls, dtype=np.float64).reshape(len(self.dts), n_cars, 3),
+            meta=np.array(json.dumps(meta)),
+            keyframes=np.array(json.dumps(self.keyframes)),
+            events=np.array(json.dumps(self.events)),
+        )
+        self.saved = True
+
+
+class Replay:
+    """Replay yang sudah di-load: bangun race, seek, dan verifikasi"""
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            self.dt = data["dt"]
+            self.controls = data["controls"]
+            self.meta = json.loads(str(data["meta"]))
+            self.keyframes = json.loads(str(data["keyframes"]))
+            self.events = {i: state for i, state in json.loads(str(data["events"]))}
+        self.steps = len(self.dt)
+        self._kf_steps = [i for i, _ in self.keyframes]
+        # waktu simulasi kumulatif di awal tiap langkah
+        self.times = np.concatenate([[0.0], np.cumsum(self.dt)])
+
+    def build_race(self, track=None, cone_image=None):
+        """Race baru di state awal replay (cone di posisi terekam)"""
+        track = track or Track(self.meta["track"])
+        cones = ConeManager.from_layout(track, self.meta["cones"], keepout=CONE_KEEPOUT, image_path=cone_image)
+        race = Race(track, cones, controllers=self.meta["controllers"], laps=self.meta["laps"],
+                    start_poses=[tuple(p) for p in self.meta["start_poses"]],
+                    start_line=tuple(self.meta["start_line"]))
+        if self.keyframes:
+            race.restore(self.keyframes[0][1])
+        return race
+
+    def advance(self, race, n=1):
+        """Simulasi maju n langkah dari race.steps (event placement ikut diterapkan)"""
+        for _ in range(n):
+            i = race.steps
+            if i >= self.steps:
+                return False
+            if i in self.events:
+                race.restore(self.events[i])
+            race.step(float(self.dt[i]))
+        return True
+
+    def seek(self, race, step):
+        """Pindah ke awal langkah `step`: restore keyframe terdekat lalu maju"""
+        if not self.keyframes:
+            return
+        step = max(0, min(int(step), self.steps))
+        k = bisect.bisect_right(self._kf_steps, step) - 1
+        # lanjut dari posisi sekarang jika sudah di antara keyframe dan target
+        if not self._kf_steps[k] <= race.steps <= step:
+            race.restore(self.keyframes[k][1])
+        self.advance(race, step - race.steps)
+
+    def seek_time(self, race, t):
+        """Seek ke langkah pertama dengan waktu simulasi >= t"""
+        self.seek(race, int(np.searchsorted(self.times, t)))
+
+    def lap_start(self, lap):
+        """Langkah awal lap ke-`lap` (1 = start) untuk mobil terdepan"""
+        if lap <= 1:
+            return 0
+        done = [steps[lap - 2] for steps in self.meta["lap_steps"] if len(steps) >= lap - 1]
+        return min(done) if done else None
+
+    def verify(self, track=None):
+        """
+        Simulasi ulang seluruh race headless dan bandingkan output controller
+        dengan rekaman. Returns None jika identik, atau (langkah, mobil,
+        terekam, hasil) untuk divergensi pertama.
+        """
+        race = self.build_race(track)
+        for i in range(self.steps):
+            self.advance(race)
+            for k, ctrl in enumerate(race.last_controls):
+                if tuple(self.controls[i, k]) != tuple(ctrl):
+                    return i, k, tuple(self.controls[i, k]), tuple(ctrl)
+        return None
+
+
+def play(replay, speed=1, lap=1):
+    """Viewer pygame: putar replay dengan kecepatan 1x/8x/64x dan seek"""
+    import pygame
+    from render import Renderer
+
+    pygame.init()
+    track = Track(replay.meta["track"])
+    screen = pygame.display.set_mode(track.surface.get_size())
+    pygame.display.set_caption("Replay")
+    clock = pygame.time.Clock()
+    font = pygame.font.SysFont(None, 22)
+
+    race = replay.build_race(track, cone_image="assets/cone.png")
+    replay.seek(race, replay.lap_start(lap) or 0)
+    renderer = Renderer(screen, track, race.cones)
+    paused = False
+    debug = False
+    sim_t = float(replay.times[race.steps])  # waktu target (detik simulasi)
+    running = True
+
+    while running:
+        frame_dt = clock.tick(60) / 1000.0
+        for e in pygame.event.get():
+            if e.type == pygame.QUIT:
+                running = False
+            elif e.type == pygame.KEYDOWN:
+                if e.key == pygame.K_ESCAPE:
+                    running = False
+                elif e.key == pygame.K_SPACE:
+                    paused = not paused
+                elif e.key == pygame.K_s:
+                    speed = SPEEDS[(SPEEDS.index(speed) + 1) % len(SPEEDS)]
+                elif e.key == pygame.K_d:
+                    debug = not debug
+                elif e.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                    sim_t = max(0.0, sim_t + (-5.0 if e.key == pygame.K_LEFT else 5.0))
+                    replay.seek_time(race, sim_t)
+                elif pygame.K_1 <= e.key <= pygame.K_9:
+                    step = replay.lap_start(e.key - pygame.K_0)
+                    if step is not None:
+                        replay.seek(race, step)
+                        sim_t = float(replay.times[race.steps])
+
+        if not paused:
+            sim_t = min(sim_t + frame_dt * speed, float(replay.times[-1]))
+            while race.steps < replay.steps and replay.times[race.steps + 1] <= sim_t:
+                replay.advance(race)
+
+        renderer.begin_frame()
+        for car in race.cars:
+            if debug and car.sensor_snapshot is None:
+                car.read_sensors(cones=race.cones)
+            renderer.mark(car.draw(screen, debug=debug))
+        laps = " | ".join(f"{car.name.split()[0]} lap {car.lap_count}" for car in race.cars)
+        txt = (f"t={replay.times[race.steps]:6.1f}s  step {race.steps}/{replay.steps}  x{speed}"
+               f"{'  PAUSED' if paused else ''}  |  {laps}")
+        renderer.blit(font.render(txt, True, (255, 255, 255)), (20, 20))
+        help_txt = "Space=pause  S=speed  Left/Right=-/+5s  1-9=lap  D=sensors"
+        renderer.blit(font.render(help_txt, True, (255, 255, 0)), (20, track.height - 24))
+        renderer.end_frame()
+
+    pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifikasi atau putar file replay")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_verify = sub.add_parser("verify", help="simulasi ulang headless dan cek identik")
+    p_verify.add_argument("files", nargs="+")
+    p_play = sub.add_parser("play", help="putar replay di viewer")
+    p_play.add_argument("file")
+    p_play.add_argument("--speed", type=int, default=1, choices=SPEEDS)
+    p_play.add_argument("--lap", type=int, default=1, help="mulai dari awal lap ini")
+    args = parser.parse_args()
+
+    if args.cmd == "verify":
+        bad = 0
+        for path in args.files:
+            replay = Replay(path)
+            diff = replay.verify()
+            if diff is None:
+                print(f"{path}: OK ({replay.steps} langkah identik)")
+            else:
+                bad += 1
+                step, car, recorded, got = diff
+                print(f"{path}: DIVERGEN di langkah {step}, mobil {car}: {recorded} != {got}")
+        raise SystemExit(1 if bad else 0)
+
+    replay = Replay(args.file)
+    play(replay, args.speed, args.lap)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,10 +8,30 @@ Fitur:
 """
 
 from utils import clamp
+import json
 import math
 
+# Konstanta yang boleh di-override dari file config (lihat tune.py)
+TUNABLE_PARAMS = (
+    "kp", "kd", "lookahead_weight", "cone_dist_trigger", "cone_steer_force",
+    "braking_factor", "min_corner_speed", "steer_deadzone", "alpha_steer",
+)
+
+
+def load_params(path):
+    """Baca parameter RuleController dari file JSON hasil tune.py
+    (dict {"params": {...}} atau langsung dict nama -> nilai)"""
+    with open(path) as f:
+        data = json.load(f)
+    params = data.get("params", data)
+    unknown = set(params) - set(TUNABLE_PARAMS)
+    if unknown:
+        raise ValueError(f"Parameter RuleController tidak dikenal: {sorted(unknown)}")
+    return params
+
+
 class RuleController:
-    def __init__(self, sensor_len: float = 400.0, max_speed: float = 900.0): 
+    def __init__(self, sensor_len: float = 400.0, max_speed: float = 900.0, params=None): 
         # Sensor diperpanjang lagi (400) untuk melihat exit tikungan lebih awal
         self.sensor_len = float(sensor_len)
         self.max_speed = float(max_speed)
@@ -44,6 +64,12 @@ class RuleController:
         self.alpha_steer = 0.2 # Smoothing steer standar
         self._last_steer = 0.0  
 
+        # Override hasil tuning (dict nama -> nilai, lihat TUNABLE_PARAMS)
+        for name, value in (params or {}).items():
+            if name not in TUNABLE_PARAMS:
+                raise ValueError(f"Parameter RuleController tidak dikenal: {name}")
+            setattr(self, name, float(value))
+
     def act(self, s):
         """
         Input: s (dict sensor)
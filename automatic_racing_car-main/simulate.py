@@ -0,0 +1,138 @@
+# simulate.py
+"""Runner headless: jalankan race tanpa display, tanpa clock.tick, tanpa render.
+
+Contoh:
+    python simulate.py --races 20 --seed 0 --laps 5
+"""
+
+import argparse
+import os
+import time
+
+from track import Track
+from cones import ConeManager
+from telemetry import TelemetryRecorder
+from replay import ReplayRecorder
+from stream import StatePublisher
+from race import (
+    Race, FixedTimestep, print_evaluation, with_rule_params, CONTROLLER_KINDS,
+    FINISH_LAPS, PHYSICS_HZ, CONE_COUNT, CONE_RADIUS, CONE_KEEPOUT, CONE_SPACING,
+)
+
+TRACK_IMAGE = "assets/track_nascar.png"
+DT = 1.0 / 60.0
+MAX_RACE_TIME = 600.0  # detik simulasi, batas jika mobil tidak pernah finish
+
+
+def simulate_race(track, controllers=("rule", "fuzzy"), cones_seed=None, laps=FINISH_LAPS, dt=DT,
+                  max_time=MAX_RACE_TIME, start_poses=None, race_number=1, telemetry_dir=None,
+                  replay_dir=None, physics_hz=PHYSICS_HZ, publisher=None):
+    """
+    Jalankan satu race penuh secara headless dengan dt tetap.
+
+    dt adalah ukuran "frame" (faktor percepatan); fisika tetap berjalan
+    dengan langkah 1/physics_hz, sehingga dt besar memberi hasil yang sama
+    dengan viewer 60 FPS.
+
+    Args:
+        track: object Track atau path gambar track
+        controllers: pasangan controller (RED, BLUE), nama "rule"/"fuzzy" atau object
+        cones_seed: seed layout cone (None = acak)
+        laps (int): jumlah lap untuk finish
+        dt (float): waktu simulasi per frame (detik)
+        max_time (float): batas waktu simulasi (detik)
+        start_poses: list (x, y, heading) per mobil, default race.START_POSES
+        race_number (int): nomor race di record
+        telemetry_dir: jika diisi, telemetry per frame disimpan ke
+            <telemetry_dir>/race_<nomor>
+        replay_dir: jika diisi, replay disimpan ke <replay_dir>/race_<nomor>.npz
+        physics_hz (int): frekuensi langkah fisika tetap
+        publisher: StatePublisher opsional (stream.py), state dikirim tiap langkah
+
+    Returns:
+        dict: record seperti di race_history (red_time, red_laps, red_crashes, ...)
+    """
+    if isinstance(track, str):
+        track = Track(track)
+    cones = ConeManager(
+        track,
+        n=CONE_COUNT,
+        radius=CONE_RADIUS,
+        keepout=CONE_KEEPOUT,
+        min_spacing=CONE_SPACING,
+        image_path=None,
+        seed=cones_seed,
+    )
+    race = Race(track, cones, controllers=controllers, laps=laps, start_poses=start_poses)
+    if telemetry_dir:
+        path = os.path.join(telemetry_dir, f"race_{race_number:04d}")
+        race.telemetry = TelemetryRecorder(path, [car.name for car in race.cars])
+
+    recorder = ReplayRecorder(race) if replay_dir else race
+
+    stepper = FixedTimestep(physics_hz)
+    frames = int(max_time / dt)
+    for _ in range(frames):
+        for _ in range(stepper.steps(dt)):
+            if race.finished:
+                break
+            recorder.step(stepper.dt)
+            if publisher is not None:
+                publisher.publish(race)
+        if race.finished:
+            break
+    race.close()
+    if replay_dir:
+        recorder.save(os.path.join(replay_dir, f"race_{race_number:04d}.npz"))
+    return race.record(race_number)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulasi race headless RED vs BLUE")
+    parser.add_argument("--track", default=TRACK_IMAGE)
+    parser.add_argument("--races", type=int, default=1, help="jumlah race")
+    parser.add_argument("--seed", type=int, default=0, help="seed cone race pertama (race ke-i pakai seed+i)")
+    parser.add_argument("--laps", type=int, default=FINISH_LAPS)
+    parser.add_argument("--dt", type=float, default=DT, help="waktu simulasi per frame (faktor percepatan)")
+    parser.add_argument("--physics-hz", type=int, default=PHYSICS_HZ, help="frekuensi langkah fisika tetap")
+    parser.add_argument("--max-time", type=float, default=MAX_RACE_TIME)
+    parser.add_argument("--red", default="rule", choices=CONTROLLER_KINDS)
+    parser.add_argument("--blue", default="fuzzy", choices=CONTROLLER_KINDS)
+    parser.add_argument("--rule-params", default=None, help="file parameter RuleController hasil tune.py")
+    parser.add_argument("--telemetry", default=None, help="folder output telemetry per frame (.npz)")
+    parser.add_argument("--replay", default=None, help="folder output file replay (lihat replay.py)")
+    parser.add_argument("--serve", default=None, metavar="ADDR",
+                        help="stream state ke viewer di host:port atau unix:<path> (lihat stream.py)")
+    args = parser.parse_args()
+
+    track = Track(args.track)
+    publisher = StatePublisher(args.serve) if args.serve else None
+    race_history = []
+    t0 = time.perf_counter()
+    try:
+        for i in range(args.races):
+            race_history.append(simulate_race(
+                track,
+                controllers=with_rule_params((args.red, args.blue), args.rule_params),
+                cones_seed=args.seed + i,
+                laps=args.laps,
+                dt=args.dt,
+                max_time=args.max_time,
+                race_number=i + 1,
+                telemetry_dir=args.telemetry,
+                replay_dir=args.replay,
+                physics_hz=args.physics_hz,
+                publisher=publisher,
+            ))
+    finally:
+        # socket (dan file unix:) dilepas juga saat error / Ctrl-C
+        if publisher is not None:
+            publisher.close()
+    elapsed = time.perf_counter() - t0
+
+    print_evaluation(race_history, args.laps)
+    print(f"{args.races} race dalam {elapsed:.1f}s wall-clock ({elapsed / args.races:.2f}s/race)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,491 @@
+# stream.py
+"""Stream state race per langkah ke viewer lain lewat socket lokal.
+
+Simulasi (simulate.py / racing_two_cars.py dengan --serve) memanggil
+StatePublisher.publish(race) tiap langkah fisika. State dikemas menjadi
+vektor integer (pose, kecepatan, lap, waktu, crash, posisi, split sektor)
+yang dikuantisasi dengan skala tetap, lalu dikirim ke tiap viewer sebagai
+delta terhadap frame terakhir yang benar-benar terkirim ke viewer itu
+(bitmask field yang berubah + zigzag varint). Layout cone hanya dikirim saat
+berubah, info race (track, nama dan warna mobil) saat race baru.
+
+Tiap viewer punya antrian frame terbatas (deque maxlen) dan thread pengirim
+sendiri. publish() hanya menambah frame ke antrian tanpa I/O dan tanpa
+menunggu: viewer yang lambat kehilangan frame tertua, simulasi tidak pernah
+tertahan. Karena delta dihitung di thread pengirim, frame yang dibuang
+tidak merusak decoding.
+
+Pesan: header <tipe:u8><panjang:u32> lalu payload.
+    M  meta JSON (track, laps, mobil, jumlah sektor)
+    C  cone JSON [[x, y, radius], ...]
+    K  keyframe (delta terhadap vektor nol)
+    D  delta terhadap frame sebelumnya
+
+Alamat: "host:port" (TCP) atau "unix:<path>" (Unix socket).
+
+Contoh:
+    python simulate.py --races 20 --serve 127.0.0.1:5555
+    python stream.py view 127.0.0.1:5555
+    python stream.py stats 127.0.0.1:5555 --seconds 10 --delay 50
+"""
+
+import argparse
+import json
+import os
+import select
+import socket
+import struct
+import threading
+import time
+from collections import deque
+
+from race import CAR_STYLES, SECTORS
+
+DEFAULT_ADDRESS = "127.0.0.1:5555"
+QUEUE_SIZE = 120  # frame per viewer (2 detik pada 60 Hz) sebelum yang tertua dibuang
+FPS = 60
+
+MSG_META = ord("M")
+MSG_CONES = ord("C")
+MSG_KEY = ord("K")
+MSG_DELTA = ord("D")
+_HEADER = struct.Struct("<BI")
+
+# (nama, skala kuantisasi): nilai dikirim sebagai round(nilai * skala)
+GLOBAL_FIELDS = (("race", 1), ("steps", 1), ("finished", 1))
+CAR_FIELDS = (
+    ("x", 16), ("y", 16), ("heading", 10000), ("vel", 16),
+    ("lap", 1), ("finished", 1), ("t", 1000), ("finish_time", 1000), ("coll", 1),
+    ("rank", 1), ("gap", 1000),
+)
+
+
+def car_fields(sectors):
+    """Field per mobil: CAR_FIELDS + satu split per sektor (-1 = belum ada)"""
+    return CAR_FIELDS + tuple((f"s{k}", 1000) for k in range(sectors))
+
+
+def parse_address(address):
+    """(family, alamat socket) dari "host:port" atau "unix:<path>" """
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[5:]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+# ================== ENCODING ==================
+def _put_varint(out, v):
+    while v >= 0x80:
+        out.append((v & 0x7F) | 0x80)
+        v >>= 7
+    out.append(v)
+
+
+def _get_varint(buf, i):
+    v = shift = 0
+    while True:
+        b = buf[i]
+        i += 1
+        v |= (b & 0x7F) << shift
+        if b < 0x80:
+            return v, i
+        shift += 7
+
+
+def encode_delta(vec, base):
+    """Vektor int sebagai delta terhadap base: n, bitmask field berubah, zigzag varint"""
+    out = bytearray()
+    mask = 0
+    diffs = []
+    for k, (v, b) in enumerate(zip(vec, base)):
+        if v != b:
+            mask |= 1 << k
+            diffs.append(v - b)
+    _put_varint(out, len(vec))
+    _put_varint(out, mask)
+    for d in diffs:
+        _put_varint(out, d * 2 if d >= 0 else -d * 2 - 1)
+    return bytes(out)
+
+
+def decode_delta(payload, base):
+    """Kebalikan encode_delta; base None = vektor nol (keyframe)"""
+    n, i = _get_varint(payload, 0)
+    mask, i = _get_varint(payload, i)
+    vec = list(base) if base is not None else [0] * n
+    if len(vec) != n:
+        raise ValueError(f"Panjang delta {n} != base {len(vec)}")
+    k = 0
+    while mask:
+        if mask & 1:
+            z, i = _get_varint(payload, i)
+            vec[k] += z >> 1 if not z & 1 else -((z + 1) >> 1)
+        mask >>= 1
+        k += 1
+    return vec
+
+
+def _message(kind, payload):
+    return _HEADER.pack(kind, len(payload)) + payload
+
+
+# ================== SERVER ==================
+class _Client:
+    """Satu viewer: antrian frame terbatas + thread pengirim"""
+
+    def __init__(self, sock, queue_size, on_close):
+        self.sock = sock
+        self.queue = deque(maxlen=queue_size)
+        self.wake = threading.Event()
+        self.on_close = on_close
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.bytes = 0
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def push(self, frame):
+        """Dipanggil dari thread simulasi: tidak pernah menunggu"""
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1  # deque membuang frame tertua
+        self.queue.append(frame)
+        self.wake.set()
+
+    def _run(self):
+        sent_meta = sent_cones = base = None
+        try:
+            while not self.closed:
+                self.wake.wait()
+                self.wake.clear()
+                # semua frame yang sudah antri dikirim dalam satu sendall
+                out = bytearray()
+                while self.queue:
+                    meta, cones, vec = self.queue.popleft()
+                    if meta is not sent_meta:
+                        out += meta
+                        sent_meta = meta
+                        base = None  # layout vektor bisa berubah antar race
+                    if cones is not sent_cones:
+                        out += cones
+                        sent_cones = cones
+                    if base is None:
+                        out += _message(MSG_KEY, encode_delta(vec, [0] * len(vec)))
+                    else:
+                        out += _message(MSG_DELTA, encode_delta(vec, base))
+                    base = vec
+                    self.sent += 1
+                if out:
+                    self.sock.sendall(out)
+                    self.bytes += len(out)
+        except OSError:
+            pass  # viewer menutup koneksi
+        finally:
+            self.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.wake.set()
+            self.sock.close()
+            self.on_close(self)
+
+
+class StatePublisher:
+    """Server state race: terima viewer di thread sendiri, publish() per langkah"""
+
+    def __init__(self, address=DEFAULT_ADDRESS, queue_size=QUEUE_SIZE):
+        self.family, addr = parse_address(address)
+        self.queue_size = queue_size
+        self.server = socket.socket(self.family, socket.SOCK_STREAM)
+        if self.family == socket.AF_UNIX:
+            if os.path.exists(addr):
+                os.unlink(addr)  # sisa server sebelumnya
+        else:
+            self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(addr)
+        self.server.listen()
+        self.address = self.server.getsockname()
+
+        # list diganti (bukan diubah) saat viewer datang/pergi: thread simulasi cukup membaca referensinya
+        self.clients = []
+        self._lock = threading.Lock()
+        self.stats = []  # (sent, dropped, bytes) viewer yang sudah putus
+        self._race = None
+        self.races = 0
+        self._meta = None
+        self._cones = None
+        self._cones_key = None
+        self._scales = None
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self.server.accept()
+            except OSError:
+                return  # server ditutup
+            if self.family != socket.AF_UNIX:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client = _Client(sock, self.queue_size, self._remove)
+            with self._lock:
+                self.clients = self.clients + [client]
+
+    def _remove(self, client):
+        with self._lock:
+            if client in self.clients:
+                self.clients = [c for c in self.clients if c is not client]
+                self.stats.append((client.sent, client.dropped, client.bytes))
+
+    def _build_meta(self, race):
+        meta = {
+            "track": os.path.abspath(race.track.img_path),
+            "laps": race.laps,
+            "race": self.races,
+            "sectors": SECTORS,
+            # warna dari CAR_STYLES, urutan sama dengan Race.cars
+            "cars": [{"name": car.name, "color": list(color), "sensor_color": list(car.sensor_color)}
+                     for car, (color, _, _) in zip(race.cars, CAR_STYLES)],
+        }
+        scales = [s for _, s in GLOBAL_FIELDS]
+        scales += [s for _, s in car_fields(SECTORS)] * len(race.cars)
+        self._scales = scales
+        self._meta = _message(MSG_META, json.dumps(meta).encode())
+
+    def publish(self, race):
+        """Kirim state race sekarang ke semua viewer (tanpa I/O di thread pemanggil)"""
+        if race is not self._race:
+            self._race = race
+            self.races += 1
+            self._meta = None
+            self._cones_key = None  # ConeManager race baru bisa memakai ulang id() yang lama
+        clients = self.clients
+        if not clients:
+            return
+        if self._meta is None:
+            self._build_meta(race)
+        cones = race.cones
+        key = (id(cones), cones.version)
+        if key != self._cones_key:
+            self._cones_key = key
+            layout = [[c.pos.x, c.pos.y, c.radius] for c in cones.cones]
+            self._cones = _message(MSG_CONES, json.dumps(layout).encode())
+
+        values = [self.races, race.steps, race.finished]
+        ranks = {i: (k, gap) for k, (i, gap) in enumerate(race.standings())}
+        for i, (car, met) in enumerate(zip(race.cars, race.metrics)):
+            rank, gap = ranks[i]
+            sectors = race.sector_times(i)
+            values += [car.pos.x, car.pos.y, car.heading, car.vel, car.lap_count, car.finished,
+                       met.t, met.finish_time, met.coll, rank, gap]
+            values += sectors + [-1.0] * (SECTORS - len(sectors))
+        frame = (self._meta, self._cones, [round(v * s) for v, s in zip(values, self._scales)])
+        for client in clients:
+            client.push(frame)
+
+    def close(self):
+        """Tutup server dan semua koneksi viewer"""
+        self.server.close()
+        for client in self.clients:
+            client.close()
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.unlink(self.address)
+
+
+# ================== CLIENT ==================
+class StateReceiver:
+    """Koneksi viewer: poll() membaca pesan yang tersedia dan meng-update state"""
+
+    def __init__(self, address=DEFAULT_ADDRESS, timeout=5.0):
+        family, addr = parse_address(address)
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(addr)
+        self._buf = bytearray()
+        self._base = None
+        self._fields = None
+        self.meta = None
+        self.cones = None
+        self.state = None
+        self.frames = 0
+        self.bytes = 0
+
+    def poll(self, timeout=0.0):
+        """Baca semua data yang sudah ada (tunggu maks. timeout detik), kembalikan
+        jumlah frame baru. ConnectionError jika server menutup koneksi."""
+        ready = select.select([self.sock], [], [], timeout)[0]
+        while ready:
+            data = self.sock.recv(1 << 16)
+            if not data:
+                raise ConnectionError("Server stream menutup koneksi")
+            self._buf += data
+            self.bytes += len(data)
+            ready = select.select([self.sock], [], [], 0)[0]
+
+        buf = self._buf
+        frames = 0
+        i = 0
+        while len(buf) - i >= _HEADER.size:
+            kind, n = _HEADER.unpack_from(buf, i)
+            if len(buf) - i - _HEADER.size < n:
+                break
+            payload = bytes(buf[i + _HEADER.size:i + _HEADER.size + n])
+            i += _HEADER.size + n
+            if kind == MSG_META:
+                self.meta = json.loads(payload)
+                self._fields = car_fields(self.meta["sectors"])
+                self._base = None
+            elif kind == MSG_CONES:
+                self.cones = json.loads(payload)
+            else:
+                self._base = decode_delta(payload, self._base if kind == MSG_DELTA else None)
+                frames += 1
+        del buf[:i]
+        if frames:
+            self.frames += frames
+            self.state = self._decode(self._base)
+        return frames
+
+    def _decode(self, vec):
+        """Vektor int -> dict state (race, steps, finished, cars[...])"""
+        state = {name: v / s for (name, s), v in zip(GLOBAL_FIELDS, vec)}
+        n = len(self._fields)
+        state["cars"] = []
+        for k in range(len(GLOBAL_FIELDS), len(vec), n):
+            car = {name: v / s for (name, s), v in zip(self._fields, vec[k:k + n])}
+            car["sectors"] = [car.pop(f"s{j}") for j in range(self.meta["sectors"])]
+            car["sectors"] = [t for t in car["sectors"] if t >= 0]
+            state["cars"].append(car)
+        return state
+
+    def close(self):
+        self.sock.close()
+
+
+# ================== VIEWER ==================
+def view(address):
+    """Viewer pygame: gambar state terakhir dari stream dengan Car.draw, ConeManager.draw, HUD"""
+    import pygame
+    from car import Car
+    from cones import ConeManager
+    from metrics import Metrics
+    from race import SENSOR_LEN, CONE_KEEPOUT
+    from render import Renderer, draw_hud
+    from track import Track
+
+    receiver = StateReceiver(address)
+    while receiver.state is None:
+        receiver.poll(1.0)
+
+    pygame.init()
+    track = Track(receiver.meta["track"])
+    screen = pygame.display.set_mode(track.surface.get_size())
+    pygame.display.set_caption(f"Stream {address}")
+    clock = pygame.time.Clock()
+    font = pygame.font.SysFont(None, 22)
+
+    meta = cones_layout = None
+    cars = metrics = renderer = None
+    connected = True
+    fps_frames, fps_t0, rate = receiver.frames, time.perf_counter(), 0.0
+    running = True
+
+    while running:
+        clock.tick(FPS)
+        for e in pygame.event.get():
+            if e.type == pygame.QUIT or (e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE):
+                running = False
+
+        if connected:
+            try:
+                receiver.poll()
+            except (ConnectionError, OSError):
+                connected = False
+
+        # race baru: mobil dan metrics dibuat ulang dari meta
+        if receiver.meta is not meta:
+            meta = receiver.meta
+            cars = [Car((0, 0), tuple(c["color"]), track, c["name"], tuple(c["sensor_color"]), SENSOR_LEN)
+                    for c in meta["cars"]]
+            metrics = [Metrics(c["name"]) for c in meta["cars"]]
+        if receiver.cones is not cones_layout:
+            cones_layout = receiver.cones
+            cones = ConeManager.from_layout(track, cones_layout, keepout=CONE_KEEPOUT,
+                                            image_path="assets/cone.png")
+            renderer = Renderer(screen, track, cones)
+
+        state = receiver.state
+        for car, met, cs in zip(cars, metrics, state["cars"]):
+            car.pos.update(cs["x"], cs["y"])
+            car.prev_pos.update(car.pos)
+            car.heading = car.prev_heading = cs["heading"]
+            car.vel = cs["vel"]
+            car.lap_count = int(cs["lap"])
+            car.finished = bool(cs["finished"])
+            met.t, met.finish_time, met.coll = cs["t"], cs["finish_time"], int(cs["coll"])
+        standings = sorted(((int(cs["rank"]), i, cs["gap"]) for i, cs in enumerate(state["cars"])))
+
+        now = time.perf_counter()
+        if now - fps_t0 >= 1.0:
+            rate = (receiver.frames - fps_frames) / (now - fps_t0)
+            fps_frames, fps_t0 = receiver.frames, now
+
+        renderer.begin_frame()
+        for car in cars:
+            renderer.mark(car.draw(screen))
+        draw_hud(renderer, font, cars, metrics, meta["laps"], [cs["sectors"] for cs in state["cars"]],
+                 [(i, gap) for _, i, gap in standings])
+        status = (f"race {int(state['race'])}  step {int(state['steps'])}  {rate:5.0f} frame/s"
+                  f"  {receiver.bytes / max(receiver.frames, 1):.0f} B/frame"
+                  f"{'' if connected else '  DISCONNECTED'}")
+        renderer.blit(font.render(status, True, (255, 255, 0)), (20, track.height - 24))
+        renderer.end_frame()
+
+    receiver.close()
+    pygame.quit()
+
+
+def stats(address, seconds=10.0, delay_ms=0.0):
+    """Viewer headless untuk uji di localhost: hitung frame dan byte yang diterima.
+    delay_ms > 0 meniru viewer lambat (server akan membuang frame)."""
+    receiver = StateReceiver(address)
+    t0 = time.perf_counter()
+    steps0 = None
+    try:
+        while time.perf_counter() - t0 < seconds:
+            receiver.poll(0.1)
+            if receiver.state and steps0 is None:
+                steps0 = receiver.state["steps"]
+            if delay_ms:
+                time.sleep(delay_ms / 1000.0)
+    except ConnectionError:
+        pass
+    elapsed = time.perf_counter() - t0
+    receiver.close()
+    print(f"{receiver.frames} frame dalam {elapsed:.1f}s ({receiver.frames / elapsed:.0f} frame/s), "
+          f"{receiver.bytes / max(receiver.frames, 1):.1f} B/frame")
+    if receiver.state:
+        print(f"state terakhir: race {int(receiver.state['race'])} step {int(receiver.state['steps'])}")
+        for car in receiver.state["cars"]:
+            print(f"  lap {int(car['lap'])} x={car['x']:.1f} y={car['y']:.1f} vel={car['vel']:.1f} "
+                  f"t={car['t']:.2f}s crash={int(car['coll'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Viewer untuk stream state race (lihat --serve)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_view = sub.add_parser("view", help="tampilkan stream di jendela pygame")
+    p_view.add_argument("address", nargs="?", default=DEFAULT_ADDRESS)
+    p_stats = sub.add_parser("stats", help="viewer headless: hitung frame/byte yang diterima")
+    p_stats.add_argument("address", nargs="?", default=DEFAULT_ADDRESS)
+    p_stats.add_argument("--seconds", type=float, default=10.0)
+    p_stats.add_argument("--delay", type=float, default=0.0, help="jeda per poll (ms), meniru viewer lambat")
+    args = parser.parse_args()
+
+    if args.cmd == "view":
+        view(args.address)
+    else:
+        stats(args.address, args.seconds, args.delay)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# telemetry.py
+"""Perekam telemetry per frame untuk semua mobil (format kolom, biner).
+
+Setiap langkah simulasi mencatat per mobil: posisi, heading, kecepatan,
+steer/throttle/brake, 10 jarak ray sensor (Car.sensor_snapshot), flag
+tabrakan dinding/cone/mobil, lap, dan status finish. Data ditulis ke buffer
+NumPy yang dialokasikan sekali (chunk baris x mobil x field), lalu saat
+penuh disimpan sebagai satu file .npz per chunk dengan satu array per kolom:
+
+    <folder>/meta.json          nama kolom, nama mobil, jumlah langkah
+    <folder>/chunk_00000.npz    t (rows,), x (rows, cars), ..., rays (rows, cars, 10)
+
+load_telemetry(folder) menggabungkan semua chunk menjadi dict kolom.
+"""
+
+import glob
+import json
+import os
+
+import numpy as np
+
+# kolom skalar float per mobil, urutan sama dengan field di buffer
+FLOAT_COLUMNS = ("x", "y", "heading", "vel", "steer", "throttle", "brake")
+N_RAYS = 10  # 9 sensor + front_long, urutan Car.read_sensors
+# flag (disimpan sebagai bool) dan lap/finished (int)
+FLAG_COLUMNS = ("hit_wall", "hit_cone", "hit_car")
+
+_RAYS = len(FLOAT_COLUMNS)
+_FLAGS = _RAYS + N_RAYS
+_LAP = _FLAGS + len(FLAG_COLUMNS)
+_FINISHED = _LAP + 1
+_HIT_CAR = _FLAGS + 2
+N_FIELDS = _FINISHED + 1
+
+
+class TelemetryRecorder:
+    """Buffer kolom per chunk, di-flush ke folder sebagai .npz"""
+
+    def __init__(self, path, car_names, chunk=3600):
+        self.path = path
+        self.car_names = list(car_names)
+        self.n_cars = len(self.car_names)
+        self.chunk = chunk
+        os.makedirs(path, exist_ok=True)
+
+        # satu blok float32 (baris, mobil, field): satu assignment per mobil per langkah
+        self._block = np.zeros((chunk, self.n_cars, N_FIELDS), dtype=np.float32)
+        self._t = np.zeros(chunk, dtype=np.float64)
+        self._zero_rays = (0.0,) * N_RAYS
+        self.row = 0
+        self.steps = 0
+        self.chunks = 0
+        self.t = 0.0
+        self.closed = False
+
+    def log_car(self, i, car, steer=0.0, throttle=0.0, brake=0.0, hit_wall=False, hit_cone=False):
+        """Catat state mobil ke-i untuk langkah sekarang (mobil yang sudah
+        finish cukup dipanggil tanpa kontrol)"""
+        snap = car.sensor_snapshot
+        rays = snap["dists"] if snap is not None else self._zero_rays
+        self._block[self.row, i] = (
+            car.pos.x, car.pos.y, car.heading, car.vel, steer, throttle, brake,
+            *rays, hit_wall, hit_cone, False, car.lap_count, car.finished,
+        )
+
+    def end_step(self, dt, hit_car=False):
+        """Tutup baris langkah ini; flush ke disk jika chunk penuh"""
+        self.t += dt
+        self._t[self.row] = self.t
+        if hit_car:
+            self._block[self.row, :, _HIT_CAR] = 1.0
+        self.row += 1
+        self.steps += 1
+        if self.row == self.chunk:
+            self.flush()
+
+    def flush(self):
+        """Tulis baris yang terisi sebagai chunk .npz, lalu pakai ulang buffer"""
+        if self.row == 0:
+            return
+        n = self.row
+        block = self._block[:n]
+        columns = {name: block[:, :, j].copy() for j, name in enumerate(FLOAT_COLUMNS)}
+        columns["rays"] = block[:, :, _RAYS:_FLAGS].copy()
+        for j, name in enumerate(FLAG_COLUMNS):
+            columns[name] = block[:, :, _FLAGS + j] != 0
+        columns["lap"] = block[:, :, _LAP].astype(np.int16)
+        columns["finished"] = block[:, :, _FINISHED] != 0
+        np.savez(os.path.join(self.path, f"chunk_{self.chunks:05d}.npz"), t=self._t[:n].copy(), **columns)
+        self.chunks += 1
+        self.row = 0
+        self._block[:] = 0.0
+
+    def close(self):
+        """Flush sisa buffer dan tulis meta.json"""
+        if self.closed:
+            return
+        self.flush()
+        meta = {
+            "cars": self.car_names,
+            "steps": self.steps,
+            "chunks": self.chunks,
+            "columns": ["t", *FLOAT_COLUMNS, "rays", *FLAG_COLUMNS, "lap", "finished"],
+            "rays": N_RAYS,
+        }
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        self.closed = True
+
+
+def load_telemetry(path):
+    """Gabungkan semua chunk di folder menjadi dict nama kolom -> array"""
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    parts = [np.load(p) for p in sorted(glob.glob(os.path.join(path, "chunk_*.npz")))]
+    data = {name: np.concatenate([p[name] for p in parts]) for name in meta["columns"]} if parts else {}
+    data["cars"] = meta["cars"]
+    return data
@@ -0,0 +1,133 @@
+# tournament.py
+"""Turnamen Rule vs Fuzzy: N race headless dibagi ke process pool.
+
+Setiap race punya seed cone sendiri (base_seed + nomor race) dan set posisi
+start yang deterministik, sehingga hasil turnamen sama berapa pun jumlah
+worker-nya. Dengan --corpus, race ke-i memakai track ke-(i mod jumlah track)
+dari folder hasil make_track_corpus.py.
+
+Contoh:
+    python tournament.py --races 200 --workers 8
+    python tournament.py --corpus track_corpus --races 400
+"""
+
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fuzzy_engine import FuzzyEngine
+from track import Track
+from race import (
+    print_evaluation, default_start_poses, with_rule_params,
+    START_POSES, FINISH_LAPS, CONTROLLER_KINDS,
+)
+from simulate import simulate_race, TRACK_IMAGE, DT, MAX_RACE_TIME
+
+# Track di-load sekali per proses worker per path (lihat worker_track)
+_worker_tracks = {}
+
+
+def start_poses_for(race_number, poses=START_POSES):
+    """Set posisi start untuk race tertentu: lajur RED/BLUE ditukar tiap race
+    agar tidak ada controller yang selalu dapat lajur dalam."""
+    if race_number % 2 == 0:
+        red, blue = poses
+        return [blue, red]
+    return list(poses)
+
+
+def worker_track(track_path):
+    """Track untuk path ini, di-load sekali per proses (dipakai juga oleh tune.py)"""
+    if track_path not in _worker_tracks:
+        _worker_tracks[track_path] = Track(track_path)
+    return _worker_tracks[track_path]
+
+
+def _run_one(job):
+    race_number, track_path, seed, controllers, laps, dt, max_time = job
+    track = worker_track(track_path)
+    record = simulate_race(
+        track,
+        controllers=controllers,
+        cones_seed=seed,
+        laps=laps,
+        dt=dt,
+        max_time=max_time,
+        start_poses=start_poses_for(race_number, default_start_poses(track)),
+        race_number=race_number,
+    )
+    record["track"] = os.path.basename(track_path)
+    return record
+
+
+def corpus_tracks(corpus_dir):
+    """Semua gambar track (png) di folder corpus, terurut"""
+    paths = sorted(glob.glob(os.path.join(corpus_dir, "*.png")))
+    if not paths:
+        raise FileNotFoundError(f"Tidak ada track di {corpus_dir}")
+    return paths
+
+
+def run_tournament(n_races, workers=None, track_path=TRACK_IMAGE, base_seed=0, controllers=("rule", "fuzzy"),
+                   laps=FINISH_LAPS, dt=DT, max_time=MAX_RACE_TIME):
+    """
+    Jalankan n_races race di process pool dan kembalikan list record
+    (format race_history), terurut menurut nomor race. track_path boleh
+    berupa list path: race ke-i memakai track_path[i % len(track_path)].
+    """
+    workers = workers or os.cpu_count() or 1
+    track_paths = [track_path] if isinstance(track_path, str) else list(track_path)
+    jobs = [
+        (i + 1, track_paths[i % len(track_paths)], base_seed + i, tuple(controllers), laps, dt, max_time)
+        for i in range(n_races)
+    ]
+    # chunk kecil agar beban tetap rata walau durasi race bervariasi
+    chunksize = max(1, n_races // (workers * 8))
+    # compile track ke cache sekali di parent; worker cukup load via mmap
+    for path in track_paths:
+        Track(path)
+    # begitu juga LUT fuzzy (file cache tidak ikut di repo)
+    if "fuzzy_lut" in controllers:
+        FuzzyEngine.from_file()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_run_one, jobs, chunksize=chunksize))
+    return sorted(results, key=lambda r: r["race"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Turnamen Rule vs Fuzzy di process pool")
+    parser.add_argument("--track", default=TRACK_IMAGE)
+    parser.add_argument("--corpus", default=None, help="folder hasil make_track_corpus.py (ganti --track)")
+    parser.add_argument("--races", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="default: jumlah core")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--laps", type=int, default=FINISH_LAPS)
+    parser.add_argument("--dt", type=float, default=DT)
+    parser.add_argument("--max-time", type=float, default=MAX_RACE_TIME)
+    parser.add_argument("--red", default="rule", choices=CONTROLLER_KINDS)
+    parser.add_argument("--blue", default="fuzzy", choices=CONTROLLER_KINDS)
+    parser.add_argument("--rule-params", default=None, help="file parameter RuleController hasil tune.py")
+    parser.add_argument("--rows", action="store_true", help="cetak baris tiap race, bukan hanya summary")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    race_history = run_tournament(
+        args.races,
+        workers=args.workers,
+        track_path=corpus_tracks(args.corpus) if args.corpus else args.track,
+        base_seed=args.seed,
+        controllers=with_rule_params((args.red, args.blue), args.rule_params),
+        laps=args.laps,
+        dt=args.dt,
+        max_time=args.max_time,
+    )
+    elapsed = time.perf_counter() - t0
+
+    print_evaluation(race_history, args.laps, rows=args.rows)
+    print(f"{args.races} race dalam {elapsed:.1f}s wall-clock ({args.races / elapsed * 3600:.0f} race/jam)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,55 +2,242 @@
 """Track class untuk mendeteksi jalan dan render track"""
 
 import pygame
+import numpy as np
+import hashlib
+import math
+import json
 import os
+import shutil
+import tempfile
+from scipy import ndimage
+
+# Folder cache track terkompilasi (mask, distance field, nearest-road, metadata)
+CACHE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "track_cache")
+CACHE_FORMAT = 1
+
+
+def load_layout(img_path):
+    """Layout track dari file .json di samping gambar, None jika tidak ada"""
+    path = os.path.splitext(img_path)[0] + ".json"
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
 
 
 class Track:
     """
     Jalan = aspal abu-abu (low saturation, mid brightness) ATAU garis biru.
     Sampling 3x3 agar robust ke noise/anti alias.
+
+    Klasifikasi seluruh gambar dilakukan sekali saat load ke `road_mask`
+    (array bool berukuran (height, width), diindeks [y, x]), sehingga
+    `is_road` cukup satu akses array. `dist_field` menyimpan jarak Euclidean
+    (px) tiap pixel jalan ke pixel non-jalan terdekat (0 di luar jalan), dan
+    `nearest_road` (2, height, width) berisi koordinat (y, x) pixel jalan
+    terdekat untuk setiap pixel.
+
+    Hasil kompilasi disimpan di cache_root (per hash isi gambar + parameter
+    warna) dan dimuat dengan np.load(mmap_mode="r"), sehingga run berikutnya
+    tidak perlu decode PNG maupun klasifikasi ulang. cache_root=None
+    menonaktifkan cache.
+
+    Jika ada file <nama gambar>.json di samping gambar (lihat
+    make_track_corpus.py), isinya dimuat ke `layout` (garis start, posisi
+    start, centerline); selain itu `layout` = None.
     """
 
-    def __init__(self, img_path):
+    def __init__(self, img_path, cache_root=CACHE_ROOT):
         if not os.path.exists(img_path):
             raise FileNotFoundError(f"Track image tidak ditemukan: {img_path}")
-        # jangan .convert di sini, karena surface display belum dibuat
-        self.surface = pygame.image.load(img_path)
-        self.width, self.height = self.surface.get_size()
+        self.img_path = img_path
+        self.layout = load_layout(img_path)
+        # surface di-decode lazy (lihat property surface); jangan .convert di
+        # sini, karena surface display belum dibuat
+        self._surface = None
         # parameter deteksi "abu-abu"
         self.gray_tol = 18
         self.gray_minB = 45
         self.gray_maxB = 185
 
-    def _is_road_pixel(self, x, y):
-        """Cek apakah pixel (x,y) adalah jalan"""
-        r, g, b = self.surface.get_at((x, y))[:3]
+        # versi surface yang sudah di-convert ke format display (lazy)
+        self._display_surface = None
+        # indeks flat pixel jalan (lazy, lihat road_index)
+        self._road_index = None
+
+        self.cache_dir = self._cache_dir(cache_root) if cache_root else None
+        if self.cache_dir and os.path.exists(os.path.join(self.cache_dir, "meta.json")):
+            self._load_cache()
+        else:
+            self.width, self.height = self.surface.get_size()
+            self.road_mask = self._build_road_mask()
+            self.dist_field = self._build_distance_field()
+            self.nearest_road = self._build_nearest_road()
+            if self.cache_dir:
+                self._save_cache()
+
+    @property
+    def surface(self):
+        """Gambar track (pygame Surface), di-decode saat pertama dipakai"""
+        if self._surface is None:
+            self._surface = pygame.image.load(self.img_path)
+        return self._surface
+
+    @property
+    def road_index(self):
+        """Indeks flat (y * width + x) semua pixel jalan, untuk sampling uniform O(1)"""
+        if self._road_index is None:
+            self._road_index = np.flatnonzero(self.road_mask)
+        return self._road_index
+
+    # ---------------- CACHE ----------------
+    def _params(self):
+        return {
+            "gray_tol": self.gray_tol,
+            "gray_minB": self.gray_minB,
+            "gray_maxB": self.gray_maxB,
+            "format": CACHE_FORMAT,
+        }
+
+    def _cache_dir(self, cache_root):
+        """Folder cache: nama gambar + hash isi file dan parameter warna"""
+        h = hashlib.sha1()
+        with open(self.img_path, "rb") as f:
+            h.update(f.read())
+        h.update(json.dumps(self._params(), sort_keys=True).encode())
+        stem = os.path.splitext(os.path.basename(self.img_path))[0]
+        return os.path.join(cache_root, f"{stem}-{h.hexdigest()[:16]}")
+
+    def _load_cache(self):
+        with open(os.path.join(self.cache_dir, "meta.json")) as f:
+            meta = json.load(f)
+        self.width, self.height = meta["width"], meta["height"]
+        # np.asarray: view ndarray biasa di atas memmap (tanpa overhead subclass)
+        load = lambda name: np.asarray(np.load(os.path.join(self.cache_dir, name + ".npy"), mmap_mode="r"))
+        self.road_mask = load("road_mask")
+        self.dist_field = load("dist_field")
+        self.nearest_road = load("nearest_road")
+
+    def _save_cache(self):
+        """Tulis ke folder sementara lalu rename, aman jika banyak proses sekaligus"""
+        root = os.path.dirname(self.cache_dir)
+        os.makedirs(root, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=root)
+        np.save(os.path.join(tmp, "road_mask.npy"), self.road_mask)
+        np.save(os.path.join(tmp, "dist_field.npy"), self.dist_field)
+        np.save(os.path.join(tmp, "nearest_road.npy"), self.nearest_road)
+        meta = dict(self._params(), width=self.width, height=self.height,
+                    image=os.path.abspath(self.img_path))
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        try:
+            os.rename(tmp, self.cache_dir)
+        except OSError:
+            # proses lain sudah menulis cache yang sama
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def _classify_pixels(self, rgb):
+        """Klasifikasi pixel jalan (vectorized), rgb berbentuk (..., 3)"""
+        rgb = rgb.astype(np.int16)
+        r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
         # Garis putih (start line) juga dianggap sebagai jalan
-        white_like = (r == 255 and g == 255 and b == 255)
-        if white_like:
-            return True
-        mean = (r + g + b) / 3
+        white_like = (r == 255) & (g == 255) & (b == 255)
+        # mean di antara batas <=> jumlah di antara 3x batas (tanpa float)
+        total = r + g + b
         gray_like = (
-            abs(r - g) <= self.gray_tol
-            and abs(g - b) <= self.gray_tol
-            and self.gray_minB <= mean <= self.gray_maxB
+            (np.abs(r - g) <= self.gray_tol)
+            & (np.abs(g - b) <= self.gray_tol)
+            & (total >= 3 * self.gray_minB)
+            & (total <= 3 * self.gray_maxB)
         )
-        blue_like = b > 150 and r < 140 and g < 175
-        return gray_like or blue_like
+        blue_like = (b > 150) & (r < 140) & (g < 175)
+        return white_like | gray_like | blue_like
+
+    def _build_road_mask(self):
+        """Bangun mask jalan (majority 3x3) untuk seluruh gambar"""
+        # surfarray berbentuk (width, height, 3) -> transpose ke (height, width, 3)
+        rgb = pygame.surfarray.array3d(self.surface).transpose(1, 0, 2)
+        pix = self._classify_pixels(rgb).astype(np.uint8)
+
+        # majority 3x3: jumlahkan 9 tetangga untuk pixel interior
+        h, w = pix.shape
+        cnt = np.zeros((h - 2, w - 2), dtype=np.uint8)
+        for dy in (0, 1, 2):
+            for dx in (0, 1, 2):
+                cnt += pix[dy:dy + h - 2, dx:dx + w - 2]
+
+        # pixel di tepi gambar selalu dianggap bukan jalan
+        mask = np.zeros((h, w), dtype=bool)
+        mask[1:-1, 1:-1] = cnt >= 5
+        return mask
+
+    def _build_distance_field(self):
+        """Euclidean distance transform dari mask jalan (px ke tepi jalan)"""
+        return ndimage.distance_transform_edt(self.road_mask).astype(np.float32)
+
+    def _build_nearest_road(self):
+        """Indeks (y, x) pixel jalan terdekat untuk setiap pixel (EDT dengan indices)"""
+        _, idx = ndimage.distance_transform_edt(~self.road_mask, return_indices=True)
+        return idx.astype(np.int16)
+
+    def road_distance(self, x, y):
+        """Jarak (px) dari pixel (x,y) ke pixel non-jalan terdekat, 0 jika bukan jalan"""
+        x, y = int(x), int(y)
+        if x < 1 or y < 1 or x >= self.width - 1 or y >= self.height - 1:
+            return 0.0
+        return float(self.dist_field[y, x])
+
+    def nearest_road_point(self, x, y):
+        """
+        Pixel jalan terdekat dari (x, y) dan normal satuan (nx, ny) ke arah
+        dalam jalan di pixel tersebut (gradien dist_field), O(1) lewat
+        nearest_road. Returns (rx, ry, nx, ny); normal (0, 0) jika datar.
+        """
+        ix = min(max(int(x), 0), self.width - 1)
+        iy = min(max(int(y), 0), self.height - 1)
+        ry, rx = int(self.nearest_road[0, iy, ix]), int(self.nearest_road[1, iy, ix])
+        # pixel jalan tidak pernah di tepi gambar, jadi tetangga selalu valid
+        d = self.dist_field
+        gx = float(d[ry, rx + 1]) - float(d[ry, rx - 1])
+        gy = float(d[ry + 1, rx]) - float(d[ry - 1, rx])
+        norm = math.hypot(gx, gy)
+        if norm == 0.0:
+            return rx, ry, 0.0, 0.0
+        return rx, ry, gx / norm, gy / norm
+
+    def nearest_road_many(self, xs, ys):
+        """Versi vectorized dari nearest_road_point, hasil array (rx, ry, nx, ny)"""
+        ix = np.clip(np.asarray(xs).astype(np.intp), 0, self.width - 1)
+        iy = np.clip(np.asarray(ys).astype(np.intp), 0, self.height - 1)
+        ry = self.nearest_road[0, iy, ix].astype(np.intp)
+        rx = self.nearest_road[1, iy, ix].astype(np.intp)
+        d = self.dist_field
+        gx = d[ry, rx + 1].astype(np.float64) - d[ry, rx - 1]
+        gy = d[ry + 1, rx].astype(np.float64) - d[ry - 1, rx]
+        norm = np.hypot(gx, gy)
+        safe = np.where(norm > 0, norm, 1.0)
+        return rx, ry, np.where(norm > 0, gx / safe, 0.0), np.where(norm > 0, gy / safe, 0.0)
 
     def is_road(self, x, y):
         """Cek apakah koordinat (x,y) adalah jalan dengan sampling 3x3"""
+        x, y = int(x), int(y)
         if x < 1 or y < 1 or x >= self.width - 1 or y >= self.height - 1:
             return False
-        # majority 3x3
-        cnt = 0
-        for dx in (-1, 0, 1):
-            for dy in (-1, 0, 1):
-                if self._is_road_pixel(x + dx, y + dy):
-                    cnt += 1
-        return cnt >= 5
+        return bool(self.road_mask[y, x])
+
+    def is_road_many(self, xs, ys):
+        """Versi vectorized dari is_road untuk array koordinat xs, ys"""
+        xs, ys = np.broadcast_arrays(
+            np.asarray(xs).astype(np.intp), np.asarray(ys).astype(np.intp)
+        )
+        inside = (xs >= 1) & (ys >= 1) & (xs < self.width - 1) & (ys < self.height - 1)
+        out = np.zeros(xs.shape, dtype=bool)
+        out[inside] = self.road_mask[ys[inside], xs[inside]]
+        return out
 
     def draw(self, screen):
         """Render track ke screen"""
-        # convert sesuai format display hanya saat draw
-        screen.blit(self.surface.convert(), (0, 0))
+        # convert sesuai format display sekali saja, saat draw pertama
+        if self._display_surface is None:
+            self._display_surface = self.surface.convert()
+        screen.blit(self._display_surface, (0, 0))
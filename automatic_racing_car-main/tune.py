@@ -0,0 +1,210 @@
+# tune.py
+"""Auto-tuner parameter RuleController (random search + successive halving).
+
+Kandidat parameter diambil acak (uniform) dari PARAM_SPACE, ditambah
+parameter default sebagai baseline. Setiap kandidat dinilai dengan race
+headless di process pool (kedua mobil memakai kandidat yang sama, sehingga
+tidak ada bias lajur atau lawan). Successive halving: semua kandidat mulai
+dengan --min-races race, lalu tiap rung hanya 1/eta kandidat terbaik yang
+lanjut dengan eta kali lebih banyak race, sampai --max-races. Kandidat yang
+kalah berhenti lebih awal, sehingga sebagian besar compute dipakai untuk
+kandidat yang menjanjikan.
+
+Skor per mobil (lebih kecil lebih baik):
+    waktu finish (atau max_time + penalti sisa lap yang belum ditempuh)
+    + crash_weight * jumlah crash
+
+Race ke-r memakai track ke-(r mod jumlah track) dan seed cone seed + r,
+sama seperti tournament.py. Hasil terbaik disimpan ke file JSON yang bisa
+di-load dengan --rule-params di simulate.py / tournament.py.
+
+Contoh:
+    python tune.py --candidates 32 --workers 8
+    python tune.py --corpus track_corpus --max-races 64 --out rule_params.json
+    python tournament.py --rule-params rule_params.json --races 200
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from track import Track
+from race import default_start_poses, MAX_SPEED
+from rule_controller import RuleController, TUNABLE_PARAMS
+from simulate import simulate_race, TRACK_IMAGE, DT
+from tournament import corpus_tracks, worker_track
+
+OUT_FILE = "rule_params.json"
+
+# Rentang pencarian (min, max) per parameter, di sekitar nilai hand-tuned
+PARAM_SPACE = {
+    "kp": (0.3, 1.5),
+    "kd": (0.5, 3.0),
+    "lookahead_weight": (0.3, 1.5),
+    "cone_dist_trigger": (150.0, 400.0),
+    "cone_steer_force": (0.5, 2.5),
+    "braking_factor": (0.25, 0.8),
+    "min_corner_speed": (200.0, 550.0),
+    "steer_deadzone": (0.0, 0.2),
+    "alpha_steer": (0.08, 0.5),
+}
+assert set(PARAM_SPACE) == set(TUNABLE_PARAMS)
+
+
+def default_params():
+    """Parameter hand-tuned RuleController saat ini (baseline)"""
+    ctrl = RuleController(MAX_SPEED)
+    return {name: getattr(ctrl, name) for name in TUNABLE_PARAMS}
+
+
+def sample_params(rng):
+    """Satu kandidat acak uniform dari PARAM_SPACE"""
+    return {name: round(rng.uniform(lo, hi), 4) for name, (lo, hi) in PARAM_SPACE.items()}
+
+
+def race_score(record, laps, max_time, crash_weight):
+    """Skor rata-rata kedua mobil untuk satu record race (lebih kecil lebih baik)"""
+    total = 0.0
+    for side in ("red", "blue"):
+        if record[f"{side}_laps"] >= laps:
+            t = record[f"{side}_time"]
+        else:
+            # tidak finish: lebih buruk dari semua yang finish, makin sedikit progress makin buruk
+            done = record.get(f"{side}_progress", record[f"{side}_laps"])
+            t = max_time * (1.0 + (laps - done) / laps)
+        total += t + crash_weight * record[f"{side}_crashes"]
+    return total / 2
+
+
+def _run_job(job):
+    cand, params, race_idx, track_path, seed, laps, dt, max_time, crash_weight = job
+    track = worker_track(track_path)
+    record = simulate_race(
+        track,
+        controllers=(RuleController(MAX_SPEED, params=params), RuleController(MAX_SPEED, params=params)),
+        cones_seed=seed,
+        laps=laps,
+        dt=dt,
+        max_time=max_time,
+        start_poses=default_start_poses(track),
+        race_number=race_idx + 1,
+    )
+    return cand, race_idx, race_score(record, laps, max_time, crash_weight)
+
+
+def tune(track_paths, candidates=32, eta=2, min_races=4, max_races=32, workers=None, seed=0,
+         laps=3, dt=DT, max_time=120.0, crash_weight=2.0, log=print):
+    """
+    Jalankan random search + successive halving.
+
+    Returns:
+        dict: params terbaik, skor, skor baseline, dan riwayat tiap rung
+    """
+    workers = workers or os.cpu_count() or 1
+    rng = random.Random(seed)
+    pool_params = [default_params()] + [sample_params(rng) for _ in range(candidates - 1)]
+    races = [(track_paths[r % len(track_paths)], seed + r) for r in range(max_races)]
+    scores = [{} for _ in pool_params]  # kandidat -> {race_idx: skor}
+
+    def evaluate(cands, n_races, pool):
+        jobs = [
+            (c, pool_params[c], r, *races[r], laps, dt, max_time, crash_weight)
+            for c in cands for r in range(n_races) if r not in scores[c]
+        ]
+        chunksize = max(1, len(jobs) // (workers * 8))
+        for c, r, s in pool.map(_run_job, jobs, chunksize=chunksize):
+            scores[c][r] = s
+        return {c: sum(scores[c][r] for r in range(n_races)) / n_races for c in cands}
+
+    # compile track ke cache sekali di parent; worker cukup load via mmap
+    for path in track_paths:
+        Track(path)
+
+    alive = list(range(len(pool_params)))
+    n_races = min(min_races, max_races)
+    history = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            t0 = time.perf_counter()
+            mean = evaluate(alive, n_races, pool)
+            alive.sort(key=mean.get)
+            history.append({"races": n_races, "candidates": len(alive), "best": mean[alive[0]]})
+            log(f"rung {len(history)}: {len(alive):3d} kandidat x {n_races:3d} race  "
+                f"terbaik {mean[alive[0]]:7.2f} (kandidat {alive[0]})  {time.perf_counter() - t0:.1f}s")
+            if len(alive) == 1 or n_races >= max_races:
+                break
+            alive = alive[:max(1, len(alive) // eta)]
+            n_races = min(n_races * eta, max_races)
+
+        best = alive[0]
+        # baseline dinilai di semua race agar perbandingannya adil
+        baseline = evaluate([0], n_races, pool)[0]
+
+    return {
+        "params": pool_params[best],
+        "score": mean[best],
+        "baseline_score": baseline,
+        "candidate": best,
+        "races": n_races,
+        "history": history,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tuning parameter RuleController (successive halving)")
+    parser.add_argument("--track", default=TRACK_IMAGE)
+    parser.add_argument("--corpus", default=None, help="folder hasil make_track_corpus.py (ganti --track)")
+    parser.add_argument("--candidates", type=int, default=32, help="jumlah kandidat (termasuk baseline)")
+    parser.add_argument("--eta", type=int, default=2, help="faktor eliminasi per rung")
+    parser.add_argument("--min-races", type=int, default=4, help="race per kandidat di rung pertama")
+    parser.add_argument("--max-races", type=int, default=32, help="race per kandidat di rung terakhir")
+    parser.add_argument("--workers", type=int, default=None, help="default: jumlah core")
+    parser.add_argument("--seed", type=int, default=0, help="seed sampling kandidat dan cone")
+    parser.add_argument("--laps", type=int, default=3)
+    parser.add_argument("--dt", type=float, default=DT)
+    parser.add_argument("--max-time", type=float, default=120.0)
+    parser.add_argument("--crash-weight", type=float, default=2.0, help="detik penalti per crash")
+    parser.add_argument("--out", default=OUT_FILE)
+    args = parser.parse_args()
+    if args.eta < 2:
+        parser.error("--eta minimal 2")
+
+    track_paths = corpus_tracks(args.corpus) if args.corpus else [args.track]
+    t0 = time.perf_counter()
+    result = tune(
+        track_paths,
+        candidates=args.candidates,
+        eta=args.eta,
+        min_races=args.min_races,
+        max_races=args.max_races,
+        workers=args.workers,
+        seed=args.seed,
+        laps=args.laps,
+        dt=args.dt,
+        max_time=args.max_time,
+        crash_weight=args.crash_weight,
+    )
+    elapsed = time.perf_counter() - t0
+
+    result["tuning"] = {
+        "tracks": [os.path.basename(p) for p in track_paths],
+        "seed": args.seed,
+        "laps": args.laps,
+        "max_time": args.max_time,
+        "crash_weight": args.crash_weight,
+    }
+    with open(args.out, "w") as f:
+        json.dump(result, f, indent=2)
+
+    print(f"Skor terbaik {result['score']:.2f} vs baseline {result['baseline_score']:.2f} "
+          f"({result['races']} race, {elapsed:.1f}s)")
+    for name, value in result["params"].items():
+        print(f"  {name:18s} {value}")
+    print(f"Disimpan ke {args.out} (pakai dengan --rule-params {args.out})")
+
+
+if __name__ == "__main__":
+    main()